@@ -0,0 +1,78 @@
+"""Time type collection over a deep, wide module instance tree.
+
+Usage: python -m benchmarks.bench_instances [--depth N] [--fanout N]
+
+Compares analyze(), which visits each definition/parameterization once,
+against a reference walk that extracts typedefs from every instance.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pyslang
+
+from benchmarks.synth import write_instance_design
+from sv_ref.core.analyzer import (
+    _compile,
+    _extract_package_types,
+    _parse_files,
+    analyze,
+)
+
+
+def _walk_every_instance(path: Path) -> tuple[int, set[tuple[str, str]]]:
+    trees = _parse_files([path], [])
+    comp = _compile(trees, [])
+    memo: dict = {}
+    seen: set[tuple[str, str]] = set()
+    count = 0
+
+    def visit(inst) -> None:
+        nonlocal count
+        count += 1
+        body = inst.body
+        for t in _extract_package_types(body, body.name, memo):
+            seen.add((t.package or "", t.name))
+        for child in body:
+            if child.kind == pyslang.SymbolKind.Instance:
+                visit(child)
+
+    for sym in comp.getRoot():
+        if sym.kind == pyslang.SymbolKind.Instance:
+            visit(sym)
+    return count, seen
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fanout", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_instance_design(Path(tmp), args.depth, args.fanout)
+
+        start = time.perf_counter()
+        count, reference = _walk_every_instance(path)
+        t_reference = time.perf_counter() - start
+
+        start = time.perf_counter()
+        refbook = analyze([path])
+        t_analyze = time.perf_counter() - start
+
+    if {(t.package or "", t.name) for t in refbook.types} != reference:
+        raise SystemExit("analyze() types differ from the reference walk")
+
+    print(f"instances:       {count}")
+    print(f"types:           {len(refbook.types)}")
+    print(f"every instance:  {t_reference:.3f}s")
+    print(f"analyze():       {t_analyze:.3f}s")
+    print(f"speedup:         {t_reference / t_analyze:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Measure CLI startup for `sv-ref --version` and `sv-ref decode`.
+
+Usage: python -m benchmarks.bench_startup [--runs N] [--budget-ms MS]
+
+Runs each command in a fresh interpreter with ``-X importtime`` and reports
+the median wall time and the cumulative import time of sv_ref.main. Exits
+non-zero if a command loads pyslang or jinja2, or if its median wall time
+exceeds the budget.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sv_ref.core.models import (
+    EnumMember,
+    FieldType,
+    Refbook,
+    RefbookMeta,
+    StructField,
+    SVType,
+    TypeKind,
+)
+from sv_ref.generator.writer import write_outputs
+
+HEAVY_MODULES = ("pyslang", "jinja2")
+_MAIN = "from sv_ref.main import main; main()"
+DEFAULT_BUDGETS_MS = {"version": 300.0, "decode": 500.0}
+
+
+def _write_refbook(out_dir: Path) -> Path:
+    state = SVType(
+        name="state_e", kind=TypeKind.ENUM, total_width=2, package="bench_pkg",
+        members=[EnumMember(name=n, value=i) for i, n in enumerate("ABC")],
+    )
+    packet = SVType(
+        name="packet_t", kind=TypeKind.STRUCT, total_width=16,
+        package="bench_pkg",
+        fields=[
+            StructField(name="header", width=8, offset=8,
+                        field_type=FieldType(name="logic[7:0]")),
+            StructField(name="status", width=2, offset=6,
+                        field_type=FieldType(name="state_e",
+                                             kind=TypeKind.ENUM),
+                        enum_members=state.members),
+            StructField(name="payload", width=6, offset=0,
+                        field_type=FieldType(name="logic[5:0]")),
+        ],
+    )
+    meta = RefbookMeta(version="0", generated_at="", source_files=[])
+    write_outputs(
+        Refbook(meta=meta, types=[state, packet]), out_dir, html_output=False,
+    )
+    return out_dir / "refbook.json"
+
+
+def _run(args: list[str]) -> tuple[float, float, set[str]]:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _MAIN, *args],
+        capture_output=True, text=True, check=True,
+    )
+    wall = time.perf_counter() - start
+
+    main_us = 0.0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        modules.add(name.split(".")[0])
+        if name == "sv_ref.main" and cumulative.strip().isdigit():
+            main_us = float(cumulative)
+    return wall, main_us / 1000, modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--budget-ms", type=float, default=None,
+        help="Wall time budget for every command (default: per command)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        refbook = _write_refbook(Path(tmp))
+        commands = {
+            "version": ["--version"],
+            "decode": ["decode", str(refbook), "packet_t", "AB8D"],
+        }
+
+        failed = False
+        for label, cmd in commands.items():
+            walls, imports = [], []
+            loaded: set[str] = set()
+            for _ in range(args.runs):
+                wall, import_ms, modules = _run(cmd)
+                walls.append(wall * 1000)
+                imports.append(import_ms)
+                loaded |= modules
+            budget = args.budget_ms or DEFAULT_BUDGETS_MS[label]
+            wall_ms = statistics.median(walls)
+            heavy = sorted(set(HEAVY_MODULES) & loaded)
+
+            status = "ok"
+            if heavy:
+                status = f"FAIL: loaded {', '.join(heavy)}"
+            elif wall_ms > budget:
+                status = f"FAIL: over {budget:.0f}ms budget"
+            failed |= status != "ok"
+            print(
+                f"{label:<8} wall {wall_ms:7.1f}ms  "
+                f"import sv_ref.main {statistics.median(imports):6.1f}ms  "
+                f"{status}"
+            )
+
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Time the main pipeline stages on a synthetic design.
+
+Usage: python -m benchmarks.bench_suite [--packages N] [--structs M]
+           [--depth D] [--enum-size E] [--max-width W] [--fanout F]
+           [--output FILE] [--baseline FILE] [--tolerance 0.2]
+
+Generates a design with benchmarks.synth.write_synthetic_design() and times
+analyze(), refbook JSON serialization, generate_html(), load_refbook() and
+decode_hex() throughput, taking the best of ``--repeat`` runs. Prints the
+results as JSON (or writes them to ``--output``). With ``--baseline`` a
+comparison against an earlier result file goes to stderr, and the exit
+status is non-zero if any stage got slower by more than ``--tolerance``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from benchmarks.synth import write_synthetic_design
+from sv_ref import __version__
+from sv_ref.core.analyzer import analyze
+from sv_ref.core.models import Refbook
+from sv_ref.core.refindex import dump_refbook
+from sv_ref.decoder import decode_hex, load_refbook
+from sv_ref.generator.html import generate_html
+from sv_ref.generator.writer import write_outputs
+
+FORMAT = 1
+
+
+def _best(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _result(seconds: float, amount: float, unit: str) -> dict:
+    return {
+        "seconds": round(seconds, 6),
+        "rate": round(amount / seconds, 3) if seconds else None,
+        "unit": f"{unit}/s",
+    }
+
+
+def run_suite(params: dict, repeat: int, values: int) -> dict:
+    results: dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(tmp)
+        files = write_synthetic_design(out_dir / "src", **params)
+
+        refbook: Refbook | None = None
+
+        def run_analyze() -> None:
+            nonlocal refbook
+            refbook = analyze(files)
+
+        seconds = _best(run_analyze, repeat)
+        assert refbook is not None
+        results["analyze"] = _result(seconds, len(refbook.types), "types")
+
+        text = ""
+
+        def run_json() -> None:
+            nonlocal text
+            text, _ = dump_refbook(refbook.with_shared_types().model_dump())
+
+        seconds = _best(run_json, repeat)
+        results["json"] = _result(seconds, len(text) / 1e6, "MB")
+
+        html = ""
+
+        def run_html() -> None:
+            nonlocal html
+            html = generate_html(refbook)
+
+        seconds = _best(run_html, repeat)
+        results["html"] = _result(seconds, len(html) / 1e6, "MB")
+
+        write_outputs(refbook, out_dir, html_output=False)
+        json_path = out_dir / "refbook.json"
+        seconds = _best(lambda: load_refbook(json_path), repeat)
+        results["load_refbook"] = _result(
+            seconds, json_path.stat().st_size / 1e6, "MB",
+        )
+
+        # The widest struct, which is also among the most deeply nested.
+        target = max(
+            (t for t in load_refbook(json_path).types if t.fields),
+            key=lambda t: t.total_width,
+        )
+        rng = random.Random(0)
+        hex_values = [
+            f"{rng.getrandbits(target.total_width):X}" for _ in range(values)
+        ]
+
+        def run_decode() -> None:
+            for value in hex_values:
+                decode_hex(target, value)
+
+        seconds = _best(run_decode, repeat)
+        results["decode_hex"] = _result(seconds, values, "values")
+
+    return {
+        "format": FORMAT,
+        "params": {**params, "values": values},
+        "environment": {
+            "sv_ref": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> bool:
+    """Print a comparison to stderr; return True if nothing regressed."""
+    if current["params"] != baseline.get("params"):
+        print("warning: baseline was run with different parameters",
+              file=sys.stderr)
+    ok = True
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            print(f"{name:<13} {result['seconds']:9.4f}s  (no baseline)",
+                  file=sys.stderr)
+            continue
+        ratio = result["seconds"] / before["seconds"]
+        status = "ok"
+        if ratio > 1 + tolerance:
+            status = "REGRESSION"
+            ok = False
+        print(
+            f"{name:<13} {result['seconds']:9.4f}s  "
+            f"baseline {before['seconds']:9.4f}s  {ratio:5.2f}x  {status}",
+            file=sys.stderr,
+        )
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--packages", type=int, default=20)
+    parser.add_argument("--structs", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--enum-size", type=int, default=16)
+    parser.add_argument("--max-width", type=int, default=64)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--values", type=int, default=10000,
+                        help="Number of values to decode")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    params = {
+        "packages": args.packages,
+        "structs": args.structs,
+        "depth": args.depth,
+        "enum_size": args.enum_size,
+        "max_width": args.max_width,
+        "fanout": args.fanout,
+    }
+    report = run_suite(params, args.repeat, args.values)
+    text = json.dumps(report, indent=2) + "\n"
+    if args.output is not None:
+        args.output.write_text(text)
+    else:
+        sys.stdout.write(text)
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        if not compare(report, baseline, args.tolerance):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
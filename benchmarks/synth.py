@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+
+def write_instance_design(out_dir: Path, depth: int, fanout: int) -> Path:
+    """Write a module hierarchy ``depth`` levels deep and return its path.
+
+    Every module instantiates ``fanout`` copies of the next level, split
+    between two parameterizations, so the tree has ``fanout ** depth``
+    leaf instances but only two bodies per level.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    lines = []
+    for level in range(depth, -1, -1):
+        lines.append(f"module synth_lvl_{level} #(parameter int W = 8) ();")
+        lines.append(
+            f"    typedef enum logic [1:0] {{ L{level}_IDLE, L{level}_BUSY }} "
+            f"lvl_{level}_state_e;"
+        )
+        lines.append("    typedef struct packed {")
+        lines.append(f"        lvl_{level}_state_e state;")
+        lines.append("        logic [W-1:0] data;")
+        lines.append(f"    }} lvl_{level}_t;")
+        if level < depth:
+            for i in range(fanout):
+                width = 8 if i % 2 == 0 else 16
+                lines.append(
+                    f"    synth_lvl_{level + 1} #(.W({width})) u_{i} ();"
+                )
+        lines.append("endmodule")
+
+    path = out_dir / "synth_top.sv"
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def write_synthetic_design(
+    out_dir: Path,
+    packages: int = 20,
+    structs: int = 20,
+    depth: int = 3,
+    enum_size: int = 16,
+    max_width: int = 64,
+    fanout: int = 8,
+) -> list[Path]:
+    """Write a parameterized design and return its file paths.
+
+    Each of the ``packages`` packages has an enum of ``enum_size`` members
+    and ``structs`` packed structs whose plain fields are 1 to
+    ``max_width`` bits wide. Struct ``s`` nests struct ``s - 1`` unless
+    ``s`` is a multiple of ``depth + 1``, so nesting goes ``depth`` levels
+    deep. A two-level module tree with ``fanout`` instances per module
+    comes last.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    enum_width = max(1, (enum_size - 1).bit_length())
+    paths = []
+    for p in range(packages):
+        lines = [f"package bench_pkg_{p};"]
+        members = ", ".join(f"B{p}_{e}" for e in range(enum_size))
+        lines.append(
+            f"    typedef enum logic [{enum_width - 1}:0] "
+            f"{{ {members} }} kind_{p}_e;"
+        )
+        for s in range(structs):
+            widths = [1 + (p * 31 + s * 17 + i * 7) % max_width
+                      for i in range(3)]
+            lines.append("    typedef struct packed {")
+            lines.append(f"        kind_{p}_e kind;")
+            lines.append(f"        logic [{widths[0] - 1}:0] addr;")
+            lines.append(f"        logic signed [{widths[1] - 1}:0] delta;")
+            if s % (depth + 1):
+                lines.append(f"        rec_{p}_{s - 1}_t inner;")
+            lines.append(f"        logic [{widths[2] - 1}:0] data;")
+            lines.append(f"    }} rec_{p}_{s}_t;")
+        lines.append("endpackage")
+
+        path = out_dir / f"bench_pkg_{p}.sv"
+        path.write_text("\n".join(lines) + "\n")
+        paths.append(path)
+    paths.append(write_instance_design(out_dir, 2, fanout))
+    return paths
@@ -1,5 +1,13 @@
 from __future__ import annotations
 
-from importlib.metadata import version
 
-__version__ = version("sv-ref")
+def __getattr__(name: str) -> str:
+    # Resolved on first use: reading the distribution metadata is not free,
+    # and most imports of sv_ref never need the version.
+    if name == "__version__":
+        from importlib.metadata import version
+
+        value = version("sv-ref")
+        globals()["__version__"] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import mmap
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Literal
+
+ByteOrder = Literal["little", "big"]
+
+
+class RecordDump:
+    """Fixed-size records in a binary file, read through a memory map.
+
+    Record ``n`` starts at ``offset + n * stride`` and spans
+    ``record_bytes`` bytes. Records are sliced from the map on demand, so
+    any record can be read without touching the ones before it and the
+    file never has to fit in memory.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        record_bytes: int,
+        stride: int | None = None,
+        byteorder: ByteOrder = "little",
+        offset: int = 0,
+    ) -> None:
+        if record_bytes < 1:
+            raise ValueError("record size must be at least 1 byte")
+        stride = record_bytes if stride is None else stride
+        if stride < record_bytes:
+            raise ValueError(
+                f"stride ({stride}) is smaller than the record size "
+                f"({record_bytes} bytes)"
+            )
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+
+        self.path = path
+        self.record_bytes = record_bytes
+        self.stride = stride
+        self.byteorder = byteorder
+        self.offset = offset
+
+        self._file = path.open("rb")
+        size = path.stat().st_size
+        self._map: mmap.mmap | None = None
+        self._view: memoryview | None = None
+        if size:
+            self._map = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ,
+            )
+            self._view = memoryview(self._map)
+
+        available = size - offset - record_bytes
+        self._count = available // stride + 1 if available >= 0 else 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(f"record {index} out of range")
+        start = self.record_offset(index)
+        return int.from_bytes(
+            self._view[start:start + self.record_bytes], self.byteorder,
+        )
+
+    def record_offset(self, index: int) -> int:
+        return self.offset + index * self.stride
+
+    def records(
+        self, start: int = 0, count: int | None = None,
+    ) -> Iterator[tuple[int, int]]:
+        stop = self._count if count is None else min(start + count, self._count)
+        for index in range(start, stop):
+            yield index, self[index]
+
+    def close(self) -> None:
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
@@ -7,6 +7,7 @@ from pathlib import Path
 import pyslang
 
 from sv_ref import __version__
+from sv_ref.core.cache import AnalysisCache, IncludeLookup
 from sv_ref.core.models import (
     EnumMember,
     FieldType,
@@ -23,63 +24,286 @@ logger = logging.getLogger(__name__)
 def analyze(
     source_files: list[Path],
     include_dirs: list[Path] | None = None,
+    cache: AnalysisCache | None = None,
+    packages_only: bool = False,
+    top: list[str] | None = None,
 ) -> Refbook:
     inc_dirs = include_dirs or []
+    options = {"packages_only": packages_only, "top": top or []}
+    types = cache.load(source_files, inc_dirs, options) if cache else None
+
+    if types is None:
+        trees = _parse_files(source_files, inc_dirs)
+        comp = _compile(trees, inc_dirs, top)
+        types = _collect_types(comp, packages_only, top)
+        if cache:
+            deps = list(source_files)
+            includes = []
+            for tree in trees:
+                deps.extend(_include_files(tree))
+                includes.extend(_include_lookups(tree))
+            cache.store(
+                source_files, inc_dirs, deps, types, options, includes,
+            )
+
+    return _make_refbook(source_files, types)
+
+
+class IncrementalAnalyzer:
+    """Re-analyze a fixed set of sources, re-parsing only what changed.
+
+    Syntax trees are kept between calls to :meth:`update` and a changed
+    source file is re-parsed on its own. pyslang caches included files per
+    source manager, so a change to an included file or to the include
+    directories starts over with a fresh source manager. Elaboration and
+    type extraction run on every update since types in an unchanged package
+    may depend on a changed one.
+    """
+
+    max_revisions = 100
+
+    def __init__(
+        self,
+        source_files: list[Path],
+        include_dirs: list[Path] | None = None,
+        packages_only: bool = False,
+        top: list[str] | None = None,
+    ) -> None:
+        self.source_files = list(source_files)
+        self.include_dirs = list(include_dirs or [])
+        self.packages_only = packages_only
+        self.top = top
+        self._bag = _make_options_bag(self.include_dirs)
+        self._sm = None
+        self._revisions = 0
+        self._trees: dict[Path, object] = {}
+        self._deps: dict[Path, list[Path]] = {}
+        self._stamps: dict[Path, tuple[int, int] | None] = {}
+        self._dir_stamps: dict[Path, tuple[int, int] | None] = {}
+
+    def watched_paths(self) -> list[Path]:
+        paths = list(self.source_files) + list(self.include_dirs)
+        for deps in self._deps.values():
+            paths.extend(deps[1:])
+        return paths
+
+    def stale_files(self) -> list[Path]:
+        if self._needs_reset():
+            return list(self.source_files)
+        return [
+            path for path in self.source_files
+            if path not in self._trees
+            or _stat_stamp(path) != self._stamps.get(path)
+        ]
+
+    def update(self) -> tuple[Refbook, list[Path]]:
+        if self._needs_reset() or self._revisions >= self.max_revisions:
+            self._reset()
+            stale = list(self.source_files)
+        else:
+            stale = self.stale_files()
+
+        for path in stale:
+            # A file that cannot be read (e.g. deleted mid-checkout) raises
+            # OSError and keeps its old stamp, so it stays stale.
+            stamp = _stat_stamp(path)
+            if path in self._trees:
+                self._revisions += 1
+                tree = pyslang.SyntaxTree.fromText(
+                    path.read_text(errors="replace"), self._sm, str(path),
+                    f"{path}#{self._revisions}", self._bag,
+                )
+            else:
+                tree = pyslang.SyntaxTree.fromFile(
+                    str(path), self._sm, self._bag,
+                )
+            self._trees[path] = tree
+            self._stamps[path] = stamp
+            self._deps[path] = [path, *_include_files(tree)]
+            for dep in self._deps[path][1:]:
+                self._stamps[dep] = _stat_stamp(dep)
+
+        trees = [self._trees[path] for path in self.source_files]
+        comp = _compile(trees, self.include_dirs, self.top)
+        types = _collect_types(comp, self.packages_only, self.top)
+        return _make_refbook(self.source_files, types), stale
+
+    def _needs_reset(self) -> bool:
+        if self._sm is None:
+            return True
+        if any(_stat_stamp(d) != st for d, st in self._dir_stamps.items()):
+            return True
+        return any(
+            _stat_stamp(dep) != self._stamps.get(dep)
+            for deps in self._deps.values()
+            for dep in deps[1:]
+        )
+
+    def _reset(self) -> None:
+        self._sm = pyslang.SourceManager()
+        self._revisions = 0
+        self._trees.clear()
+        self._deps.clear()
+        self._stamps.clear()
+        self._dir_stamps = {d: _stat_stamp(d) for d in self.include_dirs}
+
+
+def _make_refbook(source_files: list[Path], types: list[SVType]) -> Refbook:
+    meta = RefbookMeta(
+        version=__version__,
+        generated_at=datetime.now(timezone.utc).isoformat(),
+        source_files=[str(f) for f in source_files],
+    )
+    return Refbook(meta=meta, types=types)
+
+
+def _parse_files(source_files: list[Path], inc_dirs: list[Path]) -> list:
     bag = _make_options_bag(inc_dirs)
     sm = pyslang.SourceManager()
-    comp = pyslang.Compilation(options=bag)
-    for path in source_files:
-        if inc_dirs:
-            tree = pyslang.SyntaxTree.fromFile(str(path), sm, bag)
-        else:
-            tree = pyslang.SyntaxTree.fromFile(str(path))
+    return [
+        pyslang.SyntaxTree.fromFile(str(path), sm, bag)
+        for path in source_files
+    ]
+
+
+def _compile(
+    trees: list,
+    inc_dirs: list[Path],
+    top: list[str] | None = None,
+):
+    comp = pyslang.Compilation(options=_make_options_bag(inc_dirs, top))
+    for tree in trees:
         comp.addSyntaxTree(tree)
-
-    root = comp.getRoot()
+    return comp
+
+
+def _include_files(tree) -> list[Path]:
+    sm = tree.sourceManager
+    return [
+        Path(sm.getFullPath(inc.buffer.id))
+        for inc in tree.getIncludeDirectives()
+        if inc.buffer
+    ]
+
+
+def _include_lookups(tree) -> list[IncludeLookup]:
+    """Every `include in the tree with where pyslang found it, or None."""
+    sm = tree.sourceManager
+    lookups = [
+        IncludeLookup(
+            Path(sm.getFullPath(inc.syntax.sourceRange.start.buffer)),
+            inc.path, inc.isSystem, Path(sm.getFullPath(inc.buffer.id)),
+        )
+        for inc in tree.getIncludeDirectives()
+        if inc.buffer
+    ]
+    # Includes that were not found only show up as diagnostics, located at
+    # the file name token.
+    for diag in tree.diagnostics:
+        if diag.code != pyslang.Diags.CouldNotOpenIncludeFile:
+            continue
+        loc = diag.location
+        includer = Path(sm.getFullPath(loc.buffer))
+        try:
+            system = includer.read_bytes()[loc.offset:loc.offset + 1] == b"<"
+        except OSError:
+            system = False
+        lookups.append(IncludeLookup(includer, str(diag.args[0]), system, None))
+    return lookups
+
+
+def _stat_stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _collect_types(
+    comp,
+    packages_only: bool = False,
+    top: list[str] | None = None,
+) -> list[SVType]:
     types: list[SVType] = []
     seen: set[tuple[str, str]] = set()
-
-    for cu in root:
-        if cu.kind != pyslang.SymbolKind.CompilationUnit:
-            continue
+    # Extracted fields/members per canonical struct/enum type, shared by
+    # every use of that type for the whole run.
+    memo: dict = {}
+    visited: dict[str, set[tuple[str, ...]]] = {}
+
+    # Compilation units are populated as trees are added; only getRoot()
+    # elaborates the design, so package-only scans never call it.
+    for cu in comp.getCompilationUnits():
         for sym in cu:
             if sym.kind == pyslang.SymbolKind.Package:
-                for sv_type in _extract_package_types(sym, sym.name):
+                for sv_type in _extract_package_types(sym, sym.name, memo):
                     key = (sv_type.package or "", sv_type.name)
                     if key not in seen:
                         seen.add(key)
                         types.append(sv_type)
 
-    for sym in root:
-        if sym.kind == pyslang.SymbolKind.Instance:
-            _collect_instance_types(sym, types, seen)
+    if packages_only:
+        return types
 
-    meta = RefbookMeta(
-        version=__version__,
-        generated_at=datetime.now(timezone.utc).isoformat(),
-        source_files=[str(f) for f in source_files],
-    )
-    return Refbook(meta=meta, types=types)
+    root = comp.getRoot()
+    if top:
+        found = {inst.name for inst in root.topInstances}
+        missing = [name for name in top if name not in found]
+        if missing:
+            raise ValueError(f"top module not found: {', '.join(missing)}")
+        instances = list(root.topInstances)
+    else:
+        instances = [
+            sym for sym in root if sym.kind == pyslang.SymbolKind.Instance
+        ]
+
+    for inst in instances:
+        _collect_instance_types(inst, types, seen, memo, visited)
+
+    return types
 
 
 def _collect_instance_types(
     inst,
     types: list[SVType],
     seen: set[tuple[str, str]],
+    memo: dict,
+    visited: dict[str, set[tuple[str, ...]]],
 ) -> None:
     body = inst.body
     module_name = body.name
-    for sv_type in _extract_package_types(body, module_name):
-        key = (sv_type.package or "", sv_type.name)
-        if key not in seen:
-            seen.add(key)
-            types.append(sv_type)
+    params = tuple(_param_value(p) for p in body.parameters)
+
+    # Every instance of a definition declares the same typedef names, and
+    # types are deduplicated by (module, name), so only the first instance
+    # is extracted. Children can differ per parameterization (generate
+    # blocks), so each unique parameter set is still descended once.
+    if module_name not in visited:
+        visited[module_name] = set()
+        for sv_type in _extract_package_types(body, module_name, memo):
+            key = (sv_type.package or "", sv_type.name)
+            if key not in seen:
+                seen.add(key)
+                types.append(sv_type)
+    elif params in visited[module_name]:
+        return
+    visited[module_name].add(params)
+
     for child in body:
         if child.kind == pyslang.SymbolKind.Instance:
-            _collect_instance_types(child, types, seen)
+            _collect_instance_types(child, types, seen, memo, visited)
+
+
+def _param_value(param) -> str:
+    if param.kind == pyslang.SymbolKind.TypeParameter:
+        return str(param.targetType.type)
+    return str(param.value)
 
 
-def _extract_package_types(pkg_sym, pkg_name: str) -> list[SVType]:
+def _extract_package_types(
+    pkg_sym, pkg_name: str, memo: dict,
+) -> list[SVType]:
     types: list[SVType] = []
     for member in pkg_sym:
         if member.kind != pyslang.SymbolKind.TypeAlias:
@@ -87,16 +311,22 @@ def _extract_package_types(pkg_sym, pkg_name: str) -> list[SVType]:
         try:
             actual_type = member.targetType.type
             if member.isStruct:
-                types.append(_extract_struct(member, actual_type, pkg_name))
+                types.append(
+                    _extract_struct(member, actual_type, pkg_name, memo)
+                )
             elif member.isEnum:
-                types.append(_extract_enum(member, actual_type, pkg_name))
+                types.append(
+                    _extract_enum(member, actual_type, pkg_name, memo)
+                )
         except Exception:
             logger.warning("Failed to extract type '%s', skipping", member.name)
     return types
 
 
-def _extract_struct(alias_sym, actual_type, pkg_name: str) -> SVType:
-    fields = [_extract_field(f) for f in actual_type]
+def _extract_struct(
+    alias_sym, actual_type, pkg_name: str, memo: dict,
+) -> SVType:
+    fields = _struct_fields(actual_type.canonicalType, memo)
     return SVType(
         name=alias_sym.name,
         kind=TypeKind.STRUCT,
@@ -106,8 +336,10 @@ def _extract_struct(alias_sym, actual_type, pkg_name: str) -> SVType:
     )
 
 
-def _extract_enum(alias_sym, actual_type, pkg_name: str) -> SVType:
-    members = [_extract_enum_member(ev) for ev in actual_type]
+def _extract_enum(
+    alias_sym, actual_type, pkg_name: str, memo: dict,
+) -> SVType:
+    members = _enum_members(actual_type.canonicalType, memo)
     return SVType(
         name=alias_sym.name,
         kind=TypeKind.ENUM,
@@ -117,7 +349,23 @@ def _extract_enum(alias_sym, actual_type, pkg_name: str) -> SVType:
     )
 
 
-def _extract_field(field_sym) -> StructField:
+def _struct_fields(struct_type, memo: dict) -> list[StructField]:
+    fields = memo.get(struct_type)
+    if fields is None:
+        fields = [_extract_field(f, memo) for f in struct_type]
+        memo[struct_type] = fields
+    return fields
+
+
+def _enum_members(enum_type, memo: dict) -> list[EnumMember]:
+    members = memo.get(enum_type)
+    if members is None:
+        members = [_extract_enum_member(ev) for ev in enum_type]
+        memo[enum_type] = members
+    return members
+
+
+def _extract_field(field_sym, memo: dict) -> StructField:
     ft = field_sym.type
     ct = ft.canonicalType
 
@@ -127,9 +375,9 @@ def _extract_field(field_sym) -> StructField:
     enum_members = None
 
     if ct.isStruct:
-        inner_fields = [_extract_field(f) for f in ct]
+        inner_fields = _struct_fields(ct, memo)
     elif ct.isEnum:
-        enum_members = [_extract_enum_member(ev) for ev in ct]
+        enum_members = _enum_members(ct, memo)
 
     return StructField(
         name=field_sym.name,
@@ -180,8 +428,15 @@ def _determine_type_kind(type_obj) -> TypeKind | None:
     return None
 
 
-def _make_options_bag(include_dirs: list[Path]) -> pyslang.Bag:
+def _make_options_bag(
+    include_dirs: list[Path],
+    top: list[str] | None = None,
+) -> pyslang.Bag:
     prep_opts = pyslang.PreprocessorOptions()
     if include_dirs:
         prep_opts.additionalIncludePaths = include_dirs
-    return pyslang.Bag([prep_opts])
+    if not top:
+        return pyslang.Bag([prep_opts])
+    comp_opts = pyslang.CompilationOptions()
+    comp_opts.topModules = set(top)
+    return pyslang.Bag([prep_opts, comp_opts])
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from importlib.metadata import version
+from pathlib import Path
+from typing import NamedTuple
+
+from sv_ref import __version__
+from sv_ref.core.models import SVType
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT = 2
+DEFAULT_CACHE_DIR = Path(".sv-ref-cache")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class AnalysisCache:
+    """On-disk cache of extracted types, keyed by the analyze() inputs.
+
+    Each entry records the content hash of every source and included file
+    it was built from, and where each `include was found (or that it was
+    not); a lookup only hits when all of them still match, so a header
+    added earlier on the include path also invalidates it.
+    Entries are evicted least-recently-used once the directory grows past
+    ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        root: Path = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def load(
+        self,
+        source_files: list[Path],
+        include_dirs: list[Path],
+        options: dict | None = None,
+    ) -> list[SVType] | None:
+        entry_path = self._entry_path(source_files, include_dirs, options)
+        try:
+            entry = json.loads(entry_path.read_text())
+        except (OSError, ValueError):
+            return None
+
+        if entry.get("format") != CACHE_FORMAT:
+            return None
+        for name, digest in entry["files"].items():
+            if _file_digest(Path(name)) != digest:
+                logger.debug("Cache entry stale: %s changed", name)
+                return None
+        for includer, name, system, found in entry["includes"]:
+            resolved = resolve_include(
+                Path(includer), name, system, include_dirs,
+            )
+            if found != (str(resolved) if resolved else None):
+                logger.debug("Cache entry stale: `include %s moved", name)
+                return None
+
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return [
+            SVType.model_validate(t)
+            for pkg in entry["packages"]
+            for t in pkg["types"]
+        ]
+
+    def store(
+        self,
+        source_files: list[Path],
+        include_dirs: list[Path],
+        dependencies: list[Path],
+        types: list[SVType],
+        options: dict | None = None,
+        includes: list[IncludeLookup] | None = None,
+    ) -> None:
+        files: dict[str, str] = {}
+        for path in dependencies:
+            digest = _file_digest(path)
+            if digest is None:
+                return
+            files[str(path.resolve())] = digest
+
+        lookups = []
+        for inc in includes or []:
+            found = inc.found.resolve() if inc.found else None
+            if resolve_include(
+                inc.includer, inc.name, inc.system, include_dirs,
+            ) != found:
+                # Found somewhere the search below does not model; such an
+                # entry could not be checked on load.
+                return
+            lookups.append([
+                str(inc.includer.resolve()), inc.name, inc.system,
+                str(found) if found else None,
+            ])
+
+        packages: dict[str, list[dict]] = {}
+        for t in types:
+            packages.setdefault(t.package or "", []).append(t.model_dump())
+
+        entry = {
+            "format": CACHE_FORMAT,
+            "files": files,
+            "includes": lookups,
+            "packages": [
+                {"name": name, "types": pkg_types}
+                for name, pkg_types in packages.items()
+            ],
+        }
+
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            entry_path = self._entry_path(
+                source_files, include_dirs, options,
+            )
+            tmp_path = entry_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(entry))
+            os.replace(tmp_path, entry_path)
+            self._evict()
+        except OSError:
+            logger.warning("Failed to write analysis cache in %s", self.root)
+
+    def _entry_path(
+        self,
+        source_files: list[Path],
+        include_dirs: list[Path],
+        options: dict | None,
+    ) -> Path:
+        key = json.dumps({
+            "format": CACHE_FORMAT,
+            "sv_ref": __version__,
+            "pyslang": version("pyslang"),
+            "sources": [str(p.resolve()) for p in source_files],
+            "include_dirs": [str(p.resolve()) for p in include_dirs],
+            "options": options or {},
+        }, sort_keys=True)
+        return self.root / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.root.glob("*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+
+
+class IncludeLookup(NamedTuple):
+    includer: Path
+    name: str
+    system: bool
+    found: Path | None
+
+
+def resolve_include(
+    includer: Path, name: str, system: bool, include_dirs: list[Path],
+) -> Path | None:
+    """Find an `include the way pyslang does with sv-ref's options.
+
+    A quoted name is looked up next to the including file, then in each
+    include directory in order. No system include directories are set, so
+    an ``<...>`` name is only found when it is an absolute path.
+    """
+    path = Path(name)
+    if path.is_absolute():
+        candidates = [path]
+    elif system:
+        candidates = []
+    else:
+        candidates = [includer.parent / path, *(d / path for d in include_dirs)]
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate.resolve()
+    return None
+
+
+def _file_digest(path: Path) -> str | None:
+    h = hashlib.sha256()
+    try:
+        with path.open("rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    except OSError:
+        return None
+    return h.hexdigest()
@@ -1,8 +1,21 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
 from enum import Enum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, PrivateAttr
+
+SCHEMA_INLINE = 1
+SCHEMA_SHARED_TYPES = 2
+
+
+class AmbiguousTypeError(ValueError):
+    def __init__(self, name: str, candidates: list[str]) -> None:
+        super().__init__(
+            f"type '{name}' is ambiguous: {', '.join(candidates)}"
+        )
+        self.name = name
+        self.candidates = candidates
 
 
 class TypeKind(str, Enum):
@@ -28,6 +41,9 @@ class StructField(BaseModel):
     field_type: FieldType
     inner_fields: list[StructField] | None = None
     enum_members: list[EnumMember] | None = None
+    # Qualified name of a Refbook type whose fields/members stand in for
+    # inner_fields/enum_members (schema version 2 only).
+    type_ref: str | None = Field(default=None, exclude_if=lambda v: v is None)
 
 
 class SVType(BaseModel):
@@ -38,13 +54,198 @@ class SVType(BaseModel):
     fields: list[StructField] | None = None
     members: list[EnumMember] | None = None
 
+    @property
+    def qualified_name(self) -> str:
+        return f"{self.package}::{self.name}" if self.package else self.name
+
 
 class RefbookMeta(BaseModel):
     version: str
     generated_at: str
     source_files: list[str]
+    schema_version: int = Field(
+        default=SCHEMA_INLINE, exclude_if=lambda v: v == SCHEMA_INLINE,
+    )
+
+
+class _TypeIndex:
+    """Lookup tables for one list of types, keyed by the ids of its items.
+
+    The tables hold every type they were built from, so those ids stay
+    unique while the index is alive. All indexes compare equal, which
+    keeps them out of Refbook equality.
+    """
+
+    __slots__ = ("by_name", "by_qualified", "ids")
+
+    def __init__(self, types: list[SVType]) -> None:
+        self.ids = list(map(id, types))
+        self.by_qualified: dict[str, SVType] = {}
+        self.by_name: dict[str, list[SVType]] = {}
+        for t in types:
+            self.by_qualified.setdefault(t.qualified_name, t)
+            self.by_name.setdefault(t.name, []).append(t)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _TypeIndex)
+
+    __hash__ = None
+
+    def __deepcopy__(self, memo: dict) -> _TypeIndex:
+        # A deep copy has new type objects, so the index would not match.
+        return _TypeIndex([])
 
 
 class Refbook(BaseModel):
     meta: RefbookMeta
     types: list[SVType]
+    _index: _TypeIndex = PrivateAttr(default_factory=lambda: _TypeIndex([]))
+
+    def find_type(self, name: str) -> SVType | None:
+        """Look up a type by ``pkg::name`` or by a short name.
+
+        An exact qualified match wins; a short name shared by types in
+        several packages raises AmbiguousTypeError. The index is built on
+        first use.
+        """
+        by_qualified, by_name = self._type_index()
+        t = by_qualified.get(name)
+        if t is not None:
+            return t
+        matches = by_name.get(name)
+        if not matches:
+            return None
+        if len(matches) > 1:
+            raise AmbiguousTypeError(
+                name, [t.qualified_name for t in matches],
+            )
+        return matches[0]
+
+    def _type_index(
+        self,
+    ) -> tuple[dict[str, SVType], dict[str, list[SVType]]]:
+        # Rebuilt whenever the list no longer holds the same objects, since
+        # types can be replaced, grown or reassigned in place.
+        index = self._index
+        if index.ids != list(map(id, self.types)):
+            index = self._index = _TypeIndex(self.types)
+        return index.by_qualified, index.by_name
+
+    def with_shared_types(self) -> Refbook:
+        """Replace nested definitions that match a top-level type by a ref."""
+        if self.meta.schema_version == SCHEMA_SHARED_TYPES:
+            return self
+        meta = self.meta.model_copy(
+            update={"schema_version": SCHEMA_SHARED_TYPES},
+        )
+        return Refbook(meta=meta, types=list(self.iter_shared_types()))
+
+    def iter_shared_types(self) -> Iterator[SVType]:
+        """Yield the types of ``with_shared_types()`` one at a time."""
+        if self.meta.schema_version == SCHEMA_SHARED_TYPES:
+            yield from self.types
+            return
+        by_name: dict[str, list[SVType]] = {}
+        for t in self.types:
+            by_name.setdefault(t.name, []).append(t)
+
+        for t in self.types:
+            update = {}
+            if t.fields is not None:
+                update["fields"] = _share_fields(t.fields, t, by_name)
+            yield t.model_copy(update=update)
+
+    def with_inlined_types(self) -> Refbook:
+        """Resolve type refs back into inline fields/members.
+
+        Raises ValueError if a ref names a type that is not in the refbook.
+        """
+        if self.meta.schema_version == SCHEMA_INLINE:
+            return self
+        by_ref = {t.qualified_name: t for t in self.types}
+        resolved: dict[str, SVType] = {}
+
+        def resolve_type(t: SVType) -> SVType:
+            key = t.qualified_name
+            if key not in resolved:
+                fields = t.fields
+                if fields is not None:
+                    fields = resolve_fields(fields, key)
+                resolved[key] = t.model_copy(update={"fields": fields})
+            return resolved[key]
+
+        def resolve_fields(
+            fields: list[StructField], owner: str,
+        ) -> list[StructField]:
+            out = []
+            for f in fields:
+                if f.type_ref is not None:
+                    if f.type_ref not in by_ref:
+                        raise ValueError(
+                            f"{owner}.{f.name} refers to unknown type "
+                            f"'{f.type_ref}'"
+                        )
+                    target = resolve_type(by_ref[f.type_ref])
+                    f = f.model_copy(update={
+                        "inner_fields": target.fields,
+                        "enum_members": target.members,
+                        "type_ref": None,
+                    })
+                elif f.inner_fields:
+                    f = f.model_copy(
+                        update={"inner_fields": resolve_fields(
+                            f.inner_fields, f"{owner}.{f.name}",
+                        )},
+                    )
+                out.append(f)
+            return out
+
+        meta = self.meta.model_copy(update={"schema_version": SCHEMA_INLINE})
+        return Refbook(
+            meta=meta, types=[resolve_type(t) for t in self.types],
+        )
+
+
+def _share_fields(
+    fields: list[StructField],
+    owner: SVType,
+    by_name: dict[str, list[SVType]],
+) -> list[StructField]:
+    out = []
+    for f in fields:
+        target = _matching_type(f, owner, by_name)
+        if target is not None:
+            f = f.model_copy(update={
+                "inner_fields": None,
+                "enum_members": None,
+                "type_ref": target.qualified_name,
+            })
+        elif f.inner_fields:
+            f = f.model_copy(update={
+                "inner_fields": _share_fields(f.inner_fields, owner, by_name),
+            })
+        out.append(f)
+    return out
+
+
+def _matching_type(
+    field: StructField,
+    owner: SVType,
+    by_name: dict[str, list[SVType]],
+) -> SVType | None:
+    if field.field_type.kind is None:
+        return None
+    candidates = sorted(
+        by_name.get(field.field_type.name, []),
+        key=lambda t: t.package != owner.package,
+    )
+    for t in candidates:
+        if t.kind != field.field_type.kind or t.total_width != field.width:
+            continue
+        # Short type names can repeat across packages, so only point at a
+        # type whose definition is identical to the inlined one.
+        if t.kind == TypeKind.STRUCT and t.fields == field.inner_fields:
+            return t
+        if t.kind == TypeKind.ENUM and t.members == field.enum_members:
+            return t
+    return None
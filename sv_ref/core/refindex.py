@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from sv_ref.core.models import AmbiguousTypeError, Refbook, RefbookMeta, SVType
+
+INDEX_FORMAT = 1
+
+
+def index_path(refbook_path: Path) -> Path:
+    return refbook_path.with_name(f"{refbook_path.stem}.index.json")
+
+
+def dump_refbook(data: dict) -> tuple[str, dict]:
+    """Serialize a refbook dump as ``json.dumps(data, indent=2)`` would.
+
+    Also returns the sidecar index: the byte range of every entry in
+    ``types``, keyed by qualified name.
+    """
+    index: dict = {}
+    text = "".join(iter_refbook(data["meta"], data["types"], index))
+    return text, index
+
+
+def iter_refbook(
+    meta: dict, types: Iterable[dict], index: dict,
+) -> Iterator[str]:
+    """Yield ``dump_refbook()``'s text one type at a time.
+
+    ``index`` is filled in with the sidecar index once the iterator is
+    exhausted.
+    """
+    head = (
+        '{\n  "meta": '
+        + _indent(json.dumps(meta, indent=2), 2)
+        + ',\n  "types": ['
+    )
+    yield head
+    offset = len(head)
+    records: dict[str, list[int]] = {}
+    names: dict[str, list[str]] = {}
+    for t in types:
+        sep = ",\n    " if names else "\n    "
+        record = _indent(json.dumps(t, indent=2), 4)
+        yield sep + record
+        offset += len(sep)
+        qualified = _qualified(t)
+        records.setdefault(qualified, [offset, len(record)])
+        names.setdefault(t["name"], []).append(qualified)
+        offset += len(record)
+    tail = "\n  ]\n}\n" if names else "]\n}\n"
+    yield tail
+
+    # json.dumps() escapes non-ASCII, so character offsets are byte offsets.
+    index.update({
+        "format": INDEX_FORMAT,
+        "size": offset + len(tail),
+        "meta": meta,
+        "types": records,
+        "names": names,
+    })
+
+
+class RefbookIndex:
+    """Sidecar index that locates each type's record inside refbook.json.
+
+    Lets a single type (and the types it references) be read and validated
+    without parsing the rest of the file.
+    """
+
+    def __init__(self, refbook_path: Path, data: dict) -> None:
+        self.refbook_path = refbook_path
+        self.meta = RefbookMeta.model_validate(data["meta"])
+        self.records: dict[str, list[int]] = data["types"]
+        self.names: dict[str, list[str]] = data["names"]
+
+    @classmethod
+    def load(cls, refbook_path: Path) -> RefbookIndex | None:
+        """Return the index, or None if it is missing or out of date."""
+        try:
+            data = json.loads(index_path(refbook_path).read_text())
+            size = refbook_path.stat().st_size
+        except (OSError, ValueError):
+            return None
+        if data.get("format") != INDEX_FORMAT or data.get("size") != size:
+            return None
+        return cls(refbook_path, data)
+
+    def resolve(self, type_name: str) -> str | None:
+        if type_name in self.records:
+            return type_name
+        candidates = self.names.get(type_name)
+        if not candidates:
+            return None
+        if len(candidates) > 1:
+            raise AmbiguousTypeError(type_name, candidates)
+        return candidates[0]
+
+    def load_type(self, type_name: str) -> SVType | None:
+        """Read one type plus everything it refers to, with refs inlined.
+
+        Raises ValueError if a record does not hold the type the index says.
+        """
+        qualified = self.resolve(type_name)
+        if qualified is None:
+            return None
+
+        types: dict[str, dict] = {}
+        pending = [qualified]
+        with self.refbook_path.open("rb") as f:
+            while pending:
+                name = pending.pop()
+                if name in types:
+                    continue
+                if name not in self.records:
+                    raise ValueError(f"type ref not in index: {name}")
+                offset, length = self.records[name]
+                f.seek(offset)
+                t = json.loads(f.read(length))
+                if not isinstance(t, dict) or _qualified(t) != name:
+                    raise ValueError(f"index entry does not match: {name}")
+                types[name] = t
+                pending.extend(_type_refs(t.get("fields") or []))
+
+        refbook = Refbook(
+            meta=self.meta,
+            types=[SVType.model_validate(t) for t in types.values()],
+        ).with_inlined_types()
+        return refbook.find_type(qualified)
+
+
+def _indent(text: str, width: int) -> str:
+    return text.replace("\n", "\n" + " " * width)
+
+
+def _qualified(t: dict) -> str | None:
+    name = t.get("name")
+    return f"{t['package']}::{name}" if t.get("package") else name
+
+
+def _type_refs(fields: list[dict]) -> list[str]:
+    refs = []
+    for f in fields:
+        if f.get("type_ref"):
+            refs.append(f["type_ref"])
+        if f.get("inner_fields"):
+            refs.extend(_type_refs(f["inner_fields"]))
+    return refs
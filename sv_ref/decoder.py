@@ -1,77 +1,326 @@
 from __future__ import annotations
 
 import json
+import logging
+from collections import OrderedDict
 from pathlib import Path
+from typing import NamedTuple
 
-from sv_ref.core.models import Refbook, StructField, SVType
+from sv_ref.core.models import (
+    AmbiguousTypeError,
+    EnumMember,
+    Refbook,
+    StructField,
+    SVType,
+)
+from sv_ref.core.refindex import RefbookIndex
+
+logger = logging.getLogger(__name__)
 
 
 def load_refbook(path: Path) -> Refbook:
     data = json.loads(path.read_text())
-    return Refbook.model_validate(data)
+    return Refbook.model_validate(data).with_inlined_types()
+
+
+def load_type(path: Path, type_name: str) -> SVType | None:
+    """Load a single type, reading only its records if an index exists.
+
+    Falls back to loading the whole refbook when the sidecar index written
+    by ``generate`` is missing or does not match the file.
+    """
+    index = RefbookIndex.load(path)
+    if index is not None:
+        try:
+            return index.load_type(type_name)
+        except ValueError as e:
+            if isinstance(e, AmbiguousTypeError):
+                raise
+            logger.debug("Ignoring refbook index for %s: %s", path, e)
+    return find_type(load_refbook(path), type_name)
 
 
 def find_type(refbook: Refbook, type_name: str) -> SVType | None:
-    for t in refbook.types:
-        if t.name == type_name:
-            return t
-    for t in refbook.types:
-        qualified = f"{t.package}::{t.name}" if t.package else t.name
-        if qualified == type_name:
-            return t
-    return None
+    return refbook.find_type(type_name)
 
 
-def decode_hex(sv_type: SVType, hex_value: str) -> list[dict]:
+def parse_hex(hex_value: str) -> int:
     hex_str = hex_value.lstrip("0x").lstrip("0X") or "0"
-    full_value = int(hex_str, 16)
+    return int(hex_str, 16)
+
+
+def extend_bits(bits: str, width: int) -> str:
+    """Fit a binary string to ``width`` digits, as VCD extends values.
+
+    Shorter strings are padded with their leading ``x`` or ``z``, or with
+    zeros otherwise; longer ones keep their low-order digits.
+    """
+    if len(bits) >= width:
+        return bits[len(bits) - width:]
+    fill = bits[0] if bits[:1] in ("x", "z") else "0"
+    return fill * (width - len(bits)) + bits
+
+
+def decode_hex(sv_type: SVType, hex_value: str) -> list[dict]:
+    return compile_decoder(sv_type).decode(parse_hex(hex_value))
+
+
+class PlanField(NamedTuple):
+    name: str
+    path: str
+    depth: int
+    offset: int
+    width: int
+    mask: int
+    bits: str
+    hex_len: int
+    signed: bool
+    enum_names: dict[int, str] | None
+
+
+class DecodePlan:
+    """A struct type flattened into absolute bit positions for decoding.
+
+    Nested fields are listed right after their parent, in the same order
+    decode_hex() has always produced rows. An enum type decodes as a single
+    field named after the type.
+    """
+
+    def __init__(self, sv_type: SVType) -> None:
+        self.sv_type = sv_type
+        self.fields: list[PlanField] = []
+        if sv_type.fields is not None:
+            self._flatten(sv_type.fields, 0, 0, "")
+        elif sv_type.members is not None:
+            width = sv_type.total_width
+            self.fields.append(PlanField(
+                name=sv_type.name,
+                path=sv_type.name,
+                depth=0,
+                offset=0,
+                width=width,
+                mask=(1 << width) - 1,
+                bits=f"[{width - 1}:0]",
+                hex_len=(width + 3) // 4,
+                signed=False,
+                enum_names=_enum_names(sv_type.members),
+            ))
+
+    def decode(self, value: int) -> list[dict]:
+        rows = []
+        for f in self.fields:
+            raw = (value >> f.offset) & f.mask
+            rows.append({
+                "name": f.name,
+                "bits": f.bits,
+                "hex": f"0x{raw:0{f.hex_len}X}",
+                "decoded": _format_value(f, raw),
+                "depth": f.depth,
+            })
+        return rows
+
+    def decode_values(self, value: int) -> list[str]:
+        return [
+            _format_value(f, (value >> f.offset) & f.mask)
+            for f in self.fields
+        ]
+
+    def decode_bits(self, bits: str) -> list[str]:
+        """Decode a binary string of total_width digits, MSB first.
+
+        Digits may be ``x`` or ``z`` as in a waveform dump; a field with any
+        unknown bit decodes as ``x``, or ``z`` if all its unknown bits are z.
+        """
+        if not bits.strip("01"):
+            return self.decode_values(int(bits, 2))
+        width = len(bits)
+        values = []
+        for f in self.fields:
+            field_bits = bits[width - f.offset - f.width:width - f.offset]
+            if "x" in field_bits:
+                values.append("x")
+            elif "z" in field_bits:
+                values.append("z")
+            else:
+                values.append(_format_value(f, int(field_bits, 2)))
+        return values
 
-    if sv_type.fields is None:
-        return []
+    def _flatten(
+        self,
+        fields: list[StructField],
+        base: int,
+        depth: int,
+        prefix: str,
+    ) -> None:
+        for field in fields:
+            enum_names = None
+            if field.enum_members:
+                enum_names = _enum_names(field.enum_members)
 
-    rows: list[dict] = []
-    _decode_fields(sv_type.fields, full_value, 0, rows)
-    return rows
+            high_bit = field.offset + field.width - 1
+            self.fields.append(PlanField(
+                name=field.name,
+                path=prefix + field.name,
+                depth=depth,
+                offset=base + field.offset,
+                width=field.width,
+                mask=(1 << field.width) - 1,
+                bits=f"[{high_bit}:{field.offset}]",
+                hex_len=(field.width + 3) // 4,
+                signed=field.field_type.signed,
+                enum_names=enum_names,
+            ))
 
+            if field.inner_fields:
+                self._flatten(
+                    field.inner_fields, base + field.offset, depth + 1,
+                    f"{prefix}{field.name}.",
+                )
 
-def _decode_fields(
-    fields: list[StructField],
-    value: int,
-    depth: int,
-    rows: list[dict],
-) -> None:
-    for field in fields:
-        mask = (1 << field.width) - 1
-        raw_val = (value >> field.offset) & mask
 
-        high_bit = field.offset + field.width - 1
-        bits_str = f"[{high_bit}:{field.offset}]"
+def _enum_names(members: list[EnumMember]) -> dict[int, str]:
+    # The first member wins when several share a value.
+    names: dict[int, str] = {}
+    for m in members:
+        names.setdefault(m.value, m.name)
+    return names
 
-        hex_len = (field.width + 3) // 4
-        hex_str = f"0x{raw_val:0{hex_len}X}"
 
-        decoded = _decode_value(field, raw_val)
+_PLAN_CACHE_SIZE = 256
+_plan_cache: OrderedDict[int, tuple[SVType, DecodePlan]] = OrderedDict()
 
-        rows.append({
-            "name": field.name,
-            "bits": bits_str,
-            "hex": hex_str,
-            "decoded": decoded,
-            "depth": depth,
-        })
 
-        if field.inner_fields:
-            _decode_fields(field.inner_fields, raw_val, depth + 1, rows)
+def compile_decoder(sv_type: SVType) -> DecodePlan:
+    # Keyed by identity: the entry holds a reference to the type, so its id
+    # cannot be reused while the entry is cached.
+    key = id(sv_type)
+    entry = _plan_cache.get(key)
+    if entry is not None and entry[0] is sv_type:
+        _plan_cache.move_to_end(key)
+        return entry[1]
 
+    plan = DecodePlan(sv_type)
+    _plan_cache[key] = (sv_type, plan)
+    if len(_plan_cache) > _PLAN_CACHE_SIZE:
+        _plan_cache.popitem(last=False)
+    return plan
 
-def _decode_value(field: StructField, raw_val: int) -> str:
-    if field.enum_members:
-        for m in field.enum_members:
-            if m.value == raw_val:
-                return m.name
 
-    if field.field_type.signed and raw_val >= (1 << (field.width - 1)):
-        signed_val = raw_val - (1 << field.width)
-        return str(signed_val)
+def _format_value(field: PlanField, raw_val: int) -> str:
+    if field.enum_names is not None:
+        name = field.enum_names.get(raw_val)
+        if name is not None:
+            return name
+
+    if field.signed and raw_val >> (field.width - 1):
+        return str(raw_val - (1 << field.width))
 
     return str(raw_val)
+
+
+def decode_array(sv_type: SVType, values) -> dict[str, object]:
+    """Decode many packed values at once, returning one column per field.
+
+    ``values`` is a ``uint64`` array of shape ``(N,)`` for types up to 64
+    bits, or ``(N, words)`` with the least significant word first for wider
+    types, which reject a 1-D array with ValueError. Columns are keyed by dotted field path: enum fields hold member
+    names (``None`` when no member matches), signed fields are
+    sign-extended to ``int64``, other fields are ``uint64``. Fields wider
+    than 64 bits come back as object arrays of Python ints.
+
+    Without NumPy installed, ``values`` may be a sequence of ints (or of
+    little-endian word sequences) and every column is a plain list.
+    """
+    plan = compile_decoder(sv_type)
+    try:
+        import numpy as np
+    except ImportError:
+        return _decode_array_py(plan, values)
+
+    if sv_type.total_width > 64 and np.ndim(values) == 1:
+        # A single uint64 per value would silently drop the upper bits.
+        raise ValueError(
+            f"{sv_type.name} is {sv_type.total_width} bits wide; pass a "
+            "2-D array of uint64 words, least significant word first"
+        )
+    words = np.asarray(values, dtype=np.uint64)
+    if words.ndim == 1:
+        words = words[:, np.newaxis]
+    if words.ndim != 2:
+        raise ValueError("values must be a 1-D or 2-D uint64 array")
+
+    columns: dict[str, object] = {}
+    for f in plan.fields:
+        if f.width > 64:
+            columns[f.path] = _wide_column(np, f, words)
+            continue
+
+        raw = _field_column(np, f, words)
+        if f.enum_names is not None:
+            columns[f.path] = _enum_column(np, f, raw)
+        elif f.signed:
+            sign = 1 << (f.width - 1)
+            if f.width == 64:
+                columns[f.path] = raw.view(np.int64)
+            else:
+                columns[f.path] = (raw.astype(np.int64) ^ sign) - sign
+        else:
+            columns[f.path] = raw
+    return columns
+
+
+def _field_column(np, f: PlanField, words):
+    index, shift = divmod(f.offset, 64)
+    if index >= words.shape[1]:
+        return np.zeros(words.shape[0], dtype=np.uint64)
+    raw = words[:, index] >> np.uint64(shift)
+    if shift and shift + f.width > 64 and index + 1 < words.shape[1]:
+        raw = raw | (words[:, index + 1] << np.uint64(64 - shift))
+    return raw & np.uint64(f.mask)
+
+
+def _enum_column(np, f: PlanField, raw):
+    members = sorted(
+        (value, name) for value, name in f.enum_names.items()
+        if 0 <= value <= f.mask
+    )
+    keys = np.array([value for value, _ in members], dtype=np.uint64)
+    names = np.array([name for _, name in members] + [None], dtype=object)
+    if len(keys) == 0:
+        return np.full(raw.shape, None, dtype=object)
+    idx = np.minimum(np.searchsorted(keys, raw), len(keys) - 1)
+    idx = np.where(keys[idx] == raw, idx, len(keys))
+    return names[idx]
+
+
+def _wide_column(np, f: PlanField, words):
+    out = np.empty(words.shape[0], dtype=object)
+    for i, row in enumerate(words.tolist()):
+        out[i] = _field_value(f, _join_words(row))
+    return out
+
+
+def _decode_array_py(plan: DecodePlan, values) -> dict[str, object]:
+    columns: dict[str, list] = {f.path: [] for f in plan.fields}
+    for value in values:
+        if not isinstance(value, int):
+            value = _join_words(value)
+        for f in plan.fields:
+            columns[f.path].append(_field_value(f, value))
+    return columns
+
+
+def _join_words(words) -> int:
+    value = 0
+    for i, word in enumerate(words):
+        value |= int(word) << (64 * i)
+    return value
+
+
+def _field_value(f: PlanField, value: int) -> int | str | None:
+    raw = (value >> f.offset) & f.mask
+    if f.enum_names is not None:
+        return f.enum_names.get(raw)
+    if f.signed and raw >> (f.width - 1):
+        return raw - (1 << f.width)
+    return raw
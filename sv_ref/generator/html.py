@@ -1,19 +1,120 @@
 from __future__ import annotations
 
+import base64
+import functools
 import json
+import zlib
+from collections.abc import Iterator
 from importlib import resources
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
-from sv_ref.core.models import Refbook
+from sv_ref.core.models import SCHEMA_SHARED_TYPES, Refbook
 
+# Stands in for the payload when rendering, so the template can be streamed
+# around it.
+_PAYLOAD = "\0refbook-payload\0"
+_CHUNK = 1 << 16
 
-def generate_html(refbook: Refbook) -> str:
-    template_dir = resources.files("sv_ref") / "templates"
-    env = Environment(
-        loader=FileSystemLoader(str(template_dir)),
+
+@functools.cache
+def _environment() -> Environment:
+    # The bytecode cache lets later processes skip compiling the template.
+    try:
+        bytecode_cache = FileSystemBytecodeCache()
+    except (OSError, RuntimeError):
+        bytecode_cache = None
+    return Environment(
+        loader=FileSystemLoader(str(resources.files("sv_ref") / "templates")),
         autoescape=False,
+        bytecode_cache=bytecode_cache,
     )
-    template = env.get_template("index.html.j2")
-    refbook_json = json.dumps(refbook.model_dump(), indent=2)
-    return template.render(refbook_json=refbook_json)
+
+
+def generate_html(refbook: Refbook, compress: bool = False) -> str:
+    """Render the single-file viewer with the refbook embedded.
+
+    With ``compress`` the payload is minified, gzipped and base64-encoded;
+    the page inflates it with ``DecompressionStream`` when it loads.
+    """
+    return "".join(iter_html(refbook, compress))
+
+
+def generate_viewer_html(src: str = "refbook.json") -> str:
+    """Render the generic viewer, which embeds no refbook.
+
+    It fetches ``src`` (relative to the page) when served over HTTP, and
+    otherwise opens refbook.json files through a file picker or
+    drag-and-drop; its output is the same for every refbook.
+    """
+    return "".join(iter_viewer_html(src))
+
+
+def iter_html(refbook: Refbook, compress: bool = False) -> Iterator[str]:
+    """Yield ``generate_html()``'s output in chunks.
+
+    The payload is built and serialized one type at a time, so memory use
+    does not grow with the size of the page.
+    """
+    if compress:
+        payload = _gzip_base64(_iter_json(refbook, None))
+        chunks = _environment().get_template("index.html.j2").generate(
+            refbook_json=_PAYLOAD, encoding="gzip+base64",
+        )
+    else:
+        payload = _iter_json(refbook, 2)
+        chunks = _environment().get_template("index.html.j2").generate(
+            refbook_json=_PAYLOAD,
+        )
+    for chunk in chunks:
+        if _PAYLOAD in chunk:
+            head, tail = chunk.split(_PAYLOAD)
+            yield head
+            yield from payload
+            yield tail
+        else:
+            yield chunk
+
+
+def iter_viewer_html(src: str = "refbook.json") -> Iterator[str]:
+    return _environment().get_template("index.html.j2").generate(viewer_src=src)
+
+
+def _iter_json(refbook: Refbook, indent: int | None) -> Iterator[str]:
+    # Matches json.dumps(refbook.with_shared_types().model_dump(), ...) with
+    # indent=2, or minified with separators=(",", ":") when indent is None.
+    meta = refbook.meta.model_dump()
+    meta["schema_version"] = SCHEMA_SHARED_TYPES
+    types = refbook.iter_shared_types()
+    if indent is None:
+        yield '{"meta":' + _dumps(meta, None) + ',"types":['
+        for i, t in enumerate(types):
+            yield ("," if i else "") + _dumps(t.model_dump(), None)
+        yield "]}"
+        return
+
+    yield '{\n  "meta": ' + _dumps(meta, 2, 2) + ',\n  "types": ['
+    for i, t in enumerate(types):
+        yield (",\n    " if i else "\n    ") + _dumps(t.model_dump(), 2, 4)
+    yield "\n  ]\n}" if refbook.types else "]\n}"
+
+
+def _dumps(data: dict, indent: int | None, level: int = 0) -> str:
+    if indent is None:
+        return json.dumps(data, separators=(",", ":"))
+    return json.dumps(data, indent=indent).replace("\n", "\n" + " " * level)
+
+
+def _gzip_base64(chunks: Iterator[str]) -> Iterator[str]:
+    # Same stream as gzip.compress(..., mtime=0), base64-encoded in pieces
+    # whose lengths are multiples of 3 so they concatenate cleanly.
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+    pending = b""
+    for chunk in chunks:
+        pending += compressor.compress(chunk.encode())
+        if len(pending) >= _CHUNK:
+            cut = len(pending) - len(pending) % 3
+            yield base64.b64encode(pending[:cut]).decode("ascii")
+            pending = pending[cut:]
+    pending += compressor.flush()
+    yield base64.b64encode(pending).decode("ascii")
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterable
+from pathlib import Path
+
+from sv_ref.core.models import Refbook
+from sv_ref.core.refindex import index_path, iter_refbook
+from sv_ref.generator.html import generate_viewer_html, iter_html
+
+JSON_FILENAME = "refbook.json"
+HTML_FILENAME = "index.html"
+
+
+def write_outputs(
+    refbook: Refbook,
+    output_dir: Path,
+    json_output: bool = True,
+    html_output: bool = True,
+    inline_types: bool = False,
+    compress_html: bool = False,
+    viewer: bool = False,
+) -> list[Path]:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    outputs: list[Path] = []
+    # The JSON and the embedded HTML payload share this form; build it once.
+    shared = None
+    if (json_output and not inline_types) or (html_output and not viewer):
+        shared = refbook.with_shared_types()
+
+    if json_output:
+        json_path = output_dir / JSON_FILENAME
+        data = refbook if inline_types else shared
+        index: dict = {}
+        atomic_write_chunks(json_path, iter_refbook(
+            data.meta.model_dump(), (t.model_dump() for t in data.types),
+            index,
+        ))
+        atomic_write_text(index_path(json_path), json.dumps(index) + "\n")
+        outputs.append(json_path)
+
+    if html_output:
+        html_path = output_dir / HTML_FILENAME
+        if viewer:
+            # The generic viewer loads refbook.json at runtime, so it only
+            # needs writing when the viewer itself changes.
+            text = generate_viewer_html(JSON_FILENAME)
+            if _read_text(html_path) != text:
+                atomic_write_text(html_path, text)
+                outputs.append(html_path)
+        else:
+            atomic_write_chunks(html_path, iter_html(shared, compress_html))
+            outputs.append(html_path)
+
+    return outputs
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    atomic_write_chunks(path, (text,))
+
+
+def atomic_write_chunks(path: Path, chunks: Iterable[str]) -> None:
+    """Write ``chunks`` to a temporary file, then move it over ``path``."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp_path.open("w") as f:
+            f.writelines(chunks)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _read_text(path: Path) -> str | None:
+    try:
+        return path.read_text()
+    except OSError:
+        return None
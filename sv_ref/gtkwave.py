@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import TextIO
+
+from sv_ref.core.models import SVType
+from sv_ref.decoder import PlanField, compile_decoder, extend_bits
+
+_HEX_BITS = {f"{i:x}": f"{i:04b}" for i in range(16)}
+_HEX_BITS.update({"x": "xxxx", "z": "zzzz", "?": "zzzz"})
+_BASES = {"h": 16, "b": 2, "d": 10}
+
+
+class TranslateFilter:
+    """Turns one waveform value into a compact ``field=value`` line.
+
+    Values are hex by default or binary with ``radix=2``; a Verilog base
+    (``16'hAB8D``, ``'b1x0``, ``'d42``) overrides the radix. A ``0x`` or
+    ``0b`` prefix is only honoured in its own radix and for fully known
+    values; otherwise it reads as digits (``0B12`` is hex ``B12``, ``0x01``
+    is binary with an x bit). Only leaf fields are shown, named by their
+    dotted path; an enum type prints just the member name, or the number
+    when no member matches.
+    """
+
+    def __init__(
+        self, sv_type: SVType, radix: int = 16, hex_fields: bool = False,
+    ) -> None:
+        self.plan = compile_decoder(sv_type)
+        self.width = sv_type.total_width
+        self.radix = radix
+        self.hex_fields = hex_fields
+        self._bare = sv_type.fields is None
+        fields = self.plan.fields
+        self._leaves = [
+            i for i, f in enumerate(fields)
+            if i + 1 == len(fields) or fields[i + 1].depth <= f.depth
+        ]
+
+    def translate(self, text: str) -> str:
+        value = text.strip().replace("_", "").lower()
+        radix = self.radix
+        if "'" in value:
+            value = value.split("'", 1)[1].lstrip("s")
+            if value[:1] in _BASES:
+                radix = _BASES[value[0]]
+                value = value[1:]
+        if not value:
+            return text.strip()
+
+        try:
+            raw = int(value, radix) & ((1 << self.width) - 1)
+        except ValueError:
+            raw = None
+        if raw is not None:
+            if self.hex_fields:
+                decoded = [
+                    _hex_value(f, (raw >> f.offset) & f.mask)
+                    for f in self.plan.fields
+                ]
+            else:
+                decoded = self.plan.decode_values(raw)
+        else:
+            if radix == 10:
+                return text.strip()
+            if radix == 16:
+                if value.strip("0123456789abcdefxz?"):
+                    return text.strip()
+                bits = "".join(_HEX_BITS[c] for c in value)
+            else:
+                bits = value.replace("?", "z")
+                if bits.strip("01xz"):
+                    return text.strip()
+            bits = extend_bits(bits, self.width)
+            decoded = self.plan.decode_bits(bits)
+            if self.hex_fields:
+                for i, f in enumerate(self.plan.fields):
+                    if decoded[i] not in ("x", "z"):
+                        end = self.width - f.offset
+                        decoded[i] = _hex_value(
+                            f, int(bits[end - f.width:end], 2),
+                        )
+
+        if self._bare:
+            return decoded[0] if decoded else ""
+        fields = self.plan.fields
+        return " ".join(f"{fields[i].path}={decoded[i]}" for i in self._leaves)
+
+
+def _hex_value(f: PlanField, value: int) -> str:
+    if f.enum_names is not None and value in f.enum_names:
+        return f.enum_names[value]
+    return f"0x{value:0{f.hex_len}X}"
+
+
+def run_filter(filt: TranslateFilter, stdin: TextIO, stdout: TextIO) -> None:
+    """Answer each line on ``stdin`` with one line on ``stdout``, flushed."""
+    for line in iter(stdin.readline, ""):
+        stdout.write(filt.translate(line) + "\n")
+        stdout.flush()
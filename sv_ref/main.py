@@ -1,23 +1,32 @@
 from __future__ import annotations
 
+import contextlib
+import csv
 import glob as globmod
 import json
+import sys
+from enum import Enum
 from pathlib import Path
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated, TextIO
 
 import typer
 
-from sv_ref import __version__
-from sv_ref.core.analyzer import analyze
 from sv_ref.core.filelist import parse_filelist
-from sv_ref.decoder import decode_hex, find_type, load_refbook
-from sv_ref.generator.html import generate_html
+
+if TYPE_CHECKING:
+    from sv_ref.core.models import SVType
+    from sv_ref.watch import RebuildReport
+
+# Commands import what they need (pyslang, jinja2, pydantic models) inside
+# their bodies, so each one starts without loading the others' dependencies.
 
 app = typer.Typer(help="sv-ref: SystemVerilog packed type refbook generator.")
 
 
 def _version_callback(value: bool) -> None:
     if value:
+        from sv_ref import __version__
+
         typer.echo(f"sv-ref {__version__}")
         raise typer.Exit()
 
@@ -64,13 +73,205 @@ def generate(
         typer.Option("-f", "--filelist",
                      help="Filelist (.f) files to parse"),
     ] = None,
+    cache_dir: Annotated[
+        Path | None,
+        typer.Option("--cache-dir",
+                     help="Reuse analysis results cached in this directory "
+                          "(e.g. .sv-ref-cache)"),
+    ] = None,
+    inline_types: Annotated[
+        bool,
+        typer.Option("--inline-types",
+                     help="Write the schema v1 refbook.json with nested "
+                          "types inlined at every use"),
+    ] = False,
+    compress_html: Annotated[
+        bool,
+        typer.Option("--compress-html",
+                     help="Embed the refbook in index.html gzipped and "
+                          "base64-encoded (for large refbooks)"),
+    ] = False,
+    viewer: Annotated[
+        bool,
+        typer.Option("--viewer",
+                     help="Write a generic index.html that loads "
+                          "refbook.json at runtime instead of embedding it"),
+    ] = False,
+    packages_only: Annotated[
+        bool,
+        typer.Option("--packages-only",
+                     help="Only extract types from packages; skip design "
+                          "elaboration"),
+    ] = False,
+    top: Annotated[
+        list[str] | None,
+        typer.Option("--top",
+                     help="Only walk the instance tree below this top "
+                          "module (repeatable)"),
+    ] = None,
 ) -> None:
     """Parse SystemVerilog files and generate a refbook."""
+    from sv_ref.core.analyzer import analyze
+    from sv_ref.core.cache import AnalysisCache
+    from sv_ref.generator.writer import write_outputs
+
     if json_only and html_only:
         typer.echo("Error: --json-only and --html-only are mutually exclusive",
                    err=True)
         raise typer.Exit(code=1)
+    if viewer and compress_html:
+        typer.echo("Error: --viewer and --compress-html are mutually exclusive",
+                   err=True)
+        raise typer.Exit(code=1)
+
+    all_files, all_incdirs = _resolve_inputs(files, include_dir, filelist)
+
+    cache = AnalysisCache(cache_dir) if cache_dir else None
+    try:
+        refbook = analyze(
+            all_files, all_incdirs if all_incdirs else None, cache,
+            packages_only=packages_only, top=top,
+        )
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(code=1) from None
+
+    outputs = write_outputs(
+        refbook, output_dir, json_output=not html_only,
+        html_output=not json_only, inline_types=inline_types,
+        compress_html=compress_html, viewer=viewer,
+    )
+
+    typer.echo(
+        f"Generated {' and '.join(str(p) for p in outputs)} "
+        f"({len(refbook.types)} types)"
+    )
+
 
+@app.command()
+def watch(
+    files: Annotated[
+        list[Path] | None,
+        typer.Argument(help="SystemVerilog source files"),
+    ] = None,
+    include_dir: Annotated[
+        list[Path] | None,
+        typer.Option("-I", "--include-dir", help="Include directories"),
+    ] = None,
+    output_dir: Annotated[
+        Path, typer.Option("-o", "--output-dir", help="Output directory")
+    ] = Path("."),
+    json_only: Annotated[
+        bool,
+        typer.Option("--json-only", help="Only generate JSON output"),
+    ] = False,
+    html_only: Annotated[
+        bool,
+        typer.Option("--html-only", help="Only generate HTML output"),
+    ] = False,
+    filelist: Annotated[
+        list[Path] | None,
+        typer.Option("-f", "--filelist",
+                     help="Filelist (.f) files to parse"),
+    ] = None,
+    interval: Annotated[
+        float,
+        typer.Option("--interval", help="Polling interval in seconds"),
+    ] = 0.25,
+    debounce: Annotated[
+        float,
+        typer.Option("--debounce",
+                     help="Quiet period to wait for after a change, "
+                          "in seconds"),
+    ] = 0.2,
+    inline_types: Annotated[
+        bool,
+        typer.Option("--inline-types",
+                     help="Write the schema v1 refbook.json with nested "
+                          "types inlined at every use"),
+    ] = False,
+    compress_html: Annotated[
+        bool,
+        typer.Option("--compress-html",
+                     help="Embed the refbook in index.html gzipped and "
+                          "base64-encoded (for large refbooks)"),
+    ] = False,
+    viewer: Annotated[
+        bool,
+        typer.Option("--viewer",
+                     help="Write a generic index.html that loads "
+                          "refbook.json at runtime instead of embedding it"),
+    ] = False,
+    packages_only: Annotated[
+        bool,
+        typer.Option("--packages-only",
+                     help="Only extract types from packages; skip design "
+                          "elaboration"),
+    ] = False,
+    top: Annotated[
+        list[str] | None,
+        typer.Option("--top",
+                     help="Only walk the instance tree below this top "
+                          "module (repeatable)"),
+    ] = None,
+) -> None:
+    """Regenerate the refbook whenever a source or include file changes."""
+    from sv_ref.core.analyzer import IncrementalAnalyzer
+    from sv_ref.watch import watch as watch_sources
+
+    if json_only and html_only:
+        typer.echo("Error: --json-only and --html-only are mutually exclusive",
+                   err=True)
+        raise typer.Exit(code=1)
+    if viewer and compress_html:
+        typer.echo("Error: --viewer and --compress-html are mutually exclusive",
+                   err=True)
+        raise typer.Exit(code=1)
+
+    all_files, all_incdirs = _resolve_inputs(files, include_dir, filelist)
+    analyzer = IncrementalAnalyzer(
+        all_files, all_incdirs, packages_only=packages_only, top=top,
+    )
+
+    def report(r: RebuildReport) -> None:
+        if r.error is not None:
+            typer.echo(
+                f"Rebuild failed, keeping previous outputs: {r.error}",
+                err=True,
+            )
+            return
+        if not r.outputs:
+            typer.echo(
+                f"Re-parsed {len(r.changed)} file(s) in {r.seconds:.3f}s, "
+                "types unchanged"
+            )
+            return
+        typer.echo(
+            f"Rebuilt {' and '.join(str(p) for p in r.outputs)} "
+            f"({r.type_count} types, {len(r.changed)} file(s) re-parsed) "
+            f"in {r.seconds:.3f}s"
+        )
+
+    typer.echo(f"Watching {len(all_files)} file(s), press Ctrl+C to stop")
+    try:
+        watch_sources(
+            analyzer, output_dir, report,
+            json_output=not html_only, html_output=not json_only,
+            inline_types=inline_types, compress_html=compress_html,
+            viewer=viewer, poll_interval=interval, debounce=debounce,
+        )
+    except KeyboardInterrupt:
+        pass
+    except (OSError, ValueError) as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(code=1) from None
+
+
+def _resolve_inputs(
+    files: list[Path] | None,
+    include_dir: list[Path] | None,
+    filelist: list[Path] | None,
+) -> tuple[list[Path], list[Path]]:
     all_files: list[Path] = []
     all_incdirs: list[Path] = list(include_dir or [])
 
@@ -107,27 +308,7 @@ def generate(
         typer.echo("Error: no SystemVerilog files to process", err=True)
         raise typer.Exit(code=1)
 
-    refbook = analyze(all_files, all_incdirs if all_incdirs else None)
-
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    outputs = []
-
-    if not html_only:
-        json_path = output_dir / "refbook.json"
-        json_path.write_text(
-            json.dumps(refbook.model_dump(), indent=2) + "\n"
-        )
-        outputs.append(str(json_path))
-
-    if not json_only:
-        html_path = output_dir / "index.html"
-        html_path.write_text(generate_html(refbook))
-        outputs.append(str(html_path))
-
-    typer.echo(
-        f"Generated {' and '.join(outputs)} ({len(refbook.types)} types)"
-    )
+    return all_files, all_incdirs
 
 
 @app.command()
@@ -143,18 +324,9 @@ def decode(
     ],
 ) -> None:
     """Decode a hex value using a previously generated refbook."""
-    if not refbook_path.exists():
-        typer.echo(f"Error: refbook not found: {refbook_path}", err=True)
-        raise typer.Exit(code=1)
-
-    refbook = load_refbook(refbook_path)
-    sv_type = find_type(refbook, type_name)
+    from sv_ref.decoder import decode_hex
 
-    if sv_type is None:
-        available = [t.name for t in refbook.types]
-        typer.echo(f"Error: type '{type_name}' not found", err=True)
-        typer.echo(f"Available types: {', '.join(available)}", err=True)
-        raise typer.Exit(code=1)
+    sv_type = _load_type(refbook_path, type_name)
 
     rows = decode_hex(sv_type, hex_value)
 
@@ -170,6 +342,398 @@ def decode(
         typer.echo(f"{name:<20} {row['bits']:<12} {row['hex']:<12} {row['decoded']}")
 
 
+class BatchFormat(str, Enum):
+    JSONL = "jsonl"
+    CSV = "csv"
+    TSV = "tsv"
+
+
+@app.command("decode-batch")
+def decode_batch(
+    refbook_path: Annotated[
+        Path, typer.Argument(help="Path to refbook.json"),
+    ],
+    type_name: Annotated[
+        str, typer.Argument(help="Type name to decode (e.g. packet_t)"),
+    ],
+    input_path: Annotated[
+        Path,
+        typer.Option("-i", "--input",
+                     help="File with one hex value per line ('-' for stdin)"),
+    ] = Path("-"),
+    output_format: Annotated[
+        BatchFormat,
+        typer.Option("--format", help="Output format"),
+    ] = BatchFormat.JSONL,
+) -> None:
+    """Decode hex values line by line from a file or stdin."""
+    from sv_ref.decoder import compile_decoder, parse_hex
+
+    sv_type = _load_type(refbook_path, type_name)
+    plan = compile_decoder(sv_type)
+    paths = [f.path for f in plan.fields]
+    out = sys.stdout
+
+    if output_format == BatchFormat.JSONL:
+        def emit(value: str, decoded: list[str]) -> None:
+            out.write(json.dumps({
+                "value": value, "fields": dict(zip(paths, decoded)),
+            }) + "\n")
+    else:
+        delimiter = "," if output_format == BatchFormat.CSV else "\t"
+        writer = csv.writer(out, delimiter=delimiter, lineterminator="\n")
+        writer.writerow(["value", *paths])
+
+        def emit(value: str, decoded: list[str]) -> None:
+            writer.writerow([value, *decoded])
+
+    errors = 0
+    with _open_input(input_path) as lines:
+        for lineno, line in enumerate(lines, 1):
+            value = line.strip().replace("_", "")
+            if not value or value.startswith("#"):
+                continue
+            try:
+                decoded = plan.decode_values(parse_hex(value))
+            except ValueError:
+                typer.echo(
+                    f"Error: line {lineno}: invalid hex value '{value}'",
+                    err=True,
+                )
+                errors += 1
+                continue
+            emit(value, decoded)
+
+    out.flush()
+    if errors:
+        raise typer.Exit(code=1)
+
+
+class ByteOrder(str, Enum):
+    LITTLE = "little"
+    BIG = "big"
+
+
+class BinFormat(str, Enum):
+    TABLE = "table"
+    JSONL = "jsonl"
+
+
+@app.command("decode-bin")
+def decode_bin(
+    refbook_path: Annotated[
+        Path, typer.Argument(help="Path to refbook.json"),
+    ],
+    type_name: Annotated[
+        str, typer.Argument(help="Type name to decode (e.g. packet_t)"),
+    ],
+    dump_path: Annotated[
+        Path, typer.Argument(help="Binary file of packed records"),
+    ],
+    stride: Annotated[
+        int | None,
+        typer.Option("--stride", min=1,
+                     help="Bytes from one record to the next "
+                          "(default: record size)"),
+    ] = None,
+    byteorder: Annotated[
+        ByteOrder,
+        typer.Option("--byteorder", help="Byte order of each record"),
+    ] = ByteOrder.LITTLE,
+    offset: Annotated[
+        int,
+        typer.Option("--offset", min=0,
+                     help="Byte offset of the first record in the file"),
+    ] = 0,
+    start: Annotated[
+        int,
+        typer.Option("--start", min=0, help="Index of the first record to decode"),
+    ] = 0,
+    count: Annotated[
+        int | None,
+        typer.Option("-n", "--count", min=0,
+                     help="Number of records to decode (default: all)"),
+    ] = None,
+    output_format: Annotated[
+        BinFormat,
+        typer.Option("--format", help="Output format"),
+    ] = BinFormat.TABLE,
+) -> None:
+    """Decode an array of packed records from a raw binary dump."""
+    from sv_ref.bindump import RecordDump
+    from sv_ref.decoder import compile_decoder
+
+    sv_type = _load_type(refbook_path, type_name)
+    if not dump_path.exists():
+        typer.echo(f"Error: dump not found: {dump_path}", err=True)
+        raise typer.Exit(code=1)
+
+    plan = compile_decoder(sv_type)
+    paths = [f.path for f in plan.fields]
+    hex_len = (sv_type.total_width + 3) // 4
+    # Records are whole bytes; bits above the type's width are padding.
+    value_mask = (1 << sv_type.total_width) - 1
+    try:
+        dump = RecordDump(
+            dump_path, (sv_type.total_width + 7) // 8, stride,
+            byteorder.value, offset,
+        )
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(code=1) from None
+
+    out = sys.stdout
+    with contextlib.closing(dump):
+        if output_format == BinFormat.JSONL:
+            for index, value in dump.records(start, count):
+                value &= value_mask
+                out.write(json.dumps({
+                    "index": index,
+                    "offset": dump.record_offset(index),
+                    "value": f"{value:0{hex_len}X}",
+                    "fields": dict(zip(paths, plan.decode_values(value))),
+                }) + "\n")
+        else:
+            widths = [
+                max(len(f.path), len(str(f.mask)) + f.signed,
+                    *(len(n) for n in (f.enum_names or {}).values()))
+                for f in plan.fields
+            ]
+            index_width = max(5, len(str(max(len(dump) - 1, 0))))
+            value_width = max(5, hex_len)
+            out.write(" ".join([
+                f"{'index':>{index_width}}", f"{'value':<{value_width}}",
+                *(f"{p:<{w}}" for p, w in zip(paths, widths)),
+            ]).rstrip() + "\n")
+            for index, value in dump.records(start, count):
+                value &= value_mask
+                out.write(" ".join([
+                    f"{index:>{index_width}}",
+                    f"{value:0{hex_len}X}".ljust(value_width),
+                    *(f"{v:<{w}}" for v, w in
+                      zip(plan.decode_values(value), widths)),
+                ]).rstrip() + "\n")
+    out.flush()
+
+
+class VcdFormat(str, Enum):
+    JSONL = "jsonl"
+    VCD = "vcd"
+
+
+@app.command()
+def vcd(
+    refbook_path: Annotated[
+        Path, typer.Argument(help="Path to refbook.json"),
+    ],
+    vcd_path: Annotated[
+        Path, typer.Argument(help="VCD file to decode ('-' for stdin)"),
+    ],
+    mapping: Annotated[
+        list[str],
+        typer.Option("-m", "--map",
+                     help="Decode a signal as a type: "
+                          "top.dut.pkt=packet_t (repeatable)"),
+    ],
+    output_path: Annotated[
+        Path,
+        typer.Option("-o", "--output", help="Output file ('-' for stdout)"),
+    ] = Path("-"),
+    output_format: Annotated[
+        VcdFormat,
+        typer.Option("--format",
+                     help="jsonl: decoded change log; vcd: copy of the "
+                          "input with per-field sub-signals"),
+    ] = VcdFormat.JSONL,
+) -> None:
+    """Decode value changes of VCD signals through refbook types."""
+    from sv_ref.vcd import (
+        decode_changes,
+        map_signals,
+        read_header,
+        write_annotated,
+    )
+
+    types: dict[str, SVType] = {}
+    for spec in mapping:
+        path, sep, type_name = spec.partition("=")
+        if not sep or not path or not type_name:
+            typer.echo(
+                f"Error: invalid --map '{spec}', expected signal=type",
+                err=True,
+            )
+            raise typer.Exit(code=1)
+        types[path] = _load_type(refbook_path, type_name)
+
+    with _open_input(vcd_path) as lines, _open_output(output_path) as out:
+        lines = iter(lines)
+        try:
+            header = read_header(lines)
+            signals = map_signals(header, types)
+        except ValueError as e:
+            typer.echo(f"Error: {e}", err=True)
+            raise typer.Exit(code=1) from None
+
+        if output_format == VcdFormat.VCD:
+            write_annotated(header, lines, signals, out)
+        else:
+            for change in decode_changes(lines, signals):
+                out.write(json.dumps(change) + "\n")
+        out.flush()
+
+
+@app.command()
+def serve(
+    refbook_path: Annotated[
+        Path, typer.Argument(help="Path to refbook.json"),
+    ],
+    socket_path: Annotated[
+        Path | None,
+        typer.Option("--socket", help="Listen on this Unix socket"),
+    ] = None,
+    host: Annotated[
+        str, typer.Option("--host", help="TCP host (without --socket)"),
+    ] = "127.0.0.1",
+    allow_remote: Annotated[
+        bool,
+        typer.Option("--allow-remote",
+                     help="Allow a --host that is not a loopback address"),
+    ] = False,
+    port: Annotated[
+        int, typer.Option("--port", help="TCP port (without --socket)"),
+    ] = 8765,
+    reload_interval: Annotated[
+        float,
+        typer.Option("--reload-interval",
+                     help="Seconds between checks for a changed refbook"),
+    ] = 1.0,
+) -> None:
+    """Serve decode requests as JSON over a Unix socket or localhost TCP."""
+    import asyncio
+
+    from sv_ref import server
+
+    if not refbook_path.exists():
+        typer.echo(f"Error: refbook not found: {refbook_path}", err=True)
+        raise typer.Exit(code=1)
+    remote = not server.is_loopback(host)
+    if socket_path is None and remote and not allow_remote:
+        typer.echo(
+            f"Error: {host} is not a loopback address; the server has no "
+            "authentication, pass --allow-remote to listen on it anyway",
+            err=True,
+        )
+        raise typer.Exit(code=1)
+    if socket_path is not None:
+        try:
+            server.remove_stale_socket(socket_path)
+        except OSError as e:
+            typer.echo(f"Error: {e}", err=True)
+            raise typer.Exit(code=1) from None
+
+    service = server.DecodeService(refbook_path)
+    where = str(socket_path) if socket_path else f"{host}:{port}"
+    # Only remove the socket once it is known to be ours.
+    listening = False
+
+    def ready(_) -> None:
+        nonlocal listening
+        listening = socket_path is not None
+        typer.echo(
+            f"Serving {len(service.refbook.types)} types from {refbook_path} "
+            f"on {where}, press Ctrl+C to stop"
+        )
+
+    try:
+        asyncio.run(server.serve(
+            service, socket_path, host, port, reload_interval, ready,
+        ))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(code=1) from None
+    finally:
+        if listening and socket_path.is_socket():
+            socket_path.unlink()
+
+
+class Radix(str, Enum):
+    HEX = "hex"
+    BIN = "bin"
+
+
+@app.command("gtkwave-filter")
+def gtkwave_filter(
+    refbook_path: Annotated[
+        Path, typer.Argument(help="Path to refbook.json"),
+    ],
+    type_name: Annotated[
+        str, typer.Argument(help="Type name to decode (e.g. packet_t)"),
+    ],
+    radix: Annotated[
+        Radix,
+        typer.Option("--radix",
+                     help="Radix of the values GTKWave sends (its data "
+                          "format for the trace)"),
+    ] = Radix.HEX,
+    hex_fields: Annotated[
+        bool,
+        typer.Option("--hex", help="Show non-enum fields in hex"),
+    ] = False,
+) -> None:
+    """Run as a GTKWave translate filter process: one value per line."""
+    from sv_ref.gtkwave import TranslateFilter, run_filter
+
+    sv_type = _load_type(refbook_path, type_name)
+    filt = TranslateFilter(
+        sv_type, radix=16 if radix == Radix.HEX else 2, hex_fields=hex_fields,
+    )
+    try:
+        run_filter(filt, sys.stdin, sys.stdout)
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+
+
+def _open_output(path: Path) -> contextlib.AbstractContextManager[TextIO]:
+    if str(path) == "-":
+        return contextlib.nullcontext(sys.stdout)
+    return path.open("w")
+
+
+def _open_input(path: Path) -> contextlib.AbstractContextManager[TextIO]:
+    if str(path) == "-":
+        return contextlib.nullcontext(sys.stdin)
+    if not path.exists():
+        typer.echo(f"Error: input not found: {path}", err=True)
+        raise typer.Exit(code=1)
+    return path.open()
+
+
+def _load_type(refbook_path: Path, type_name: str) -> SVType:
+    from sv_ref.core.models import AmbiguousTypeError
+    from sv_ref.decoder import load_refbook, load_type
+
+    if not refbook_path.exists():
+        typer.echo(f"Error: refbook not found: {refbook_path}", err=True)
+        raise typer.Exit(code=1)
+
+    try:
+        sv_type = load_type(refbook_path, type_name)
+    except AmbiguousTypeError as e:
+        typer.echo(f"Error: {e}", err=True)
+        typer.echo("Use a qualified name (pkg::name)", err=True)
+        raise typer.Exit(code=1) from None
+
+    if sv_type is None:
+        available = [t.name for t in load_refbook(refbook_path).types]
+        typer.echo(f"Error: type '{type_name}' not found", err=True)
+        typer.echo(f"Available types: {', '.join(available)}", err=True)
+        raise typer.Exit(code=1)
+
+    return sv_type
+
+
 def main() -> None:
     app()
 
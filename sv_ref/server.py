@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import ipaddress
+import json
+import logging
+import signal
+import socket
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+from sv_ref.core.models import Refbook
+from sv_ref.decoder import DecodePlan, compile_decoder, load_refbook, parse_hex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+_PLAN_CACHE_SIZE = 256
+_MAX_LINE = 1 << 24
+
+
+class DecodeService:
+    """Answers decode requests from a refbook kept in memory.
+
+    A request is a JSON object with a ``type`` and either one ``value`` or a
+    list of ``values`` (hex strings or integers); an optional ``id`` is
+    echoed back. Compiled decoders are kept in an LRU keyed by the
+    requested type name and dropped whenever the refbook is reloaded.
+    """
+
+    def __init__(self, refbook_path: Path) -> None:
+        self.refbook_path = refbook_path
+        self.stamp = _stat_stamp(refbook_path)
+        self.refbook = load_refbook(refbook_path)
+        self._plans: OrderedDict[str, DecodePlan] = OrderedDict()
+
+    def changed_on_disk(self) -> bool:
+        return _stat_stamp(self.refbook_path) != self.stamp
+
+    def swap(self, refbook: Refbook, stamp: tuple[int, int] | None) -> None:
+        self.refbook = refbook
+        self.stamp = stamp
+        self._plans.clear()
+
+    def plan(self, type_name: str) -> DecodePlan:
+        plan = self._plans.get(type_name)
+        if plan is not None:
+            self._plans.move_to_end(type_name)
+            return plan
+
+        sv_type = self.refbook.find_type(type_name)
+        if sv_type is None:
+            raise LookupError(f"type '{type_name}' not found")
+        plan = compile_decoder(sv_type)
+        self._plans[type_name] = plan
+        if len(self._plans) > _PLAN_CACHE_SIZE:
+            self._plans.popitem(last=False)
+        return plan
+
+    def handle(self, request: object) -> dict:
+        if not isinstance(request, dict):
+            return {"error": "request must be a JSON object"}
+        response: dict = {}
+        if "id" in request:
+            response["id"] = request["id"]
+
+        type_name = request.get("type")
+        if not isinstance(type_name, str):
+            response["error"] = "missing 'type'"
+            return response
+        try:
+            plan = self.plan(type_name)
+        except (LookupError, ValueError) as e:
+            response["error"] = str(e)
+            return response
+
+        paths = [f.path for f in plan.fields]
+        if "values" in request:
+            values = request["values"]
+            if not isinstance(values, list):
+                response["error"] = "'values' must be a list"
+                return response
+            response["results"] = [
+                _decode_one(plan, paths, value) for value in values
+            ]
+        elif "value" in request:
+            response.update(_decode_one(plan, paths, request["value"]))
+        else:
+            response["error"] = "missing 'value' or 'values'"
+        return response
+
+    def handle_json(self, data: bytes) -> dict:
+        try:
+            request = json.loads(data)
+        except ValueError:
+            return {"error": "invalid JSON"}
+        return self.handle(request)
+
+
+def _decode_one(plan: DecodePlan, paths: list[str], value: object) -> dict:
+    raw = None
+    if isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+        raw = value
+    elif isinstance(value, str):
+        try:
+            raw = parse_hex(value.replace("_", ""))
+        except ValueError:
+            pass
+    if raw is None:
+        return {"value": value, "error": f"invalid value: {value!r}"}
+    return {"value": value, "fields": dict(zip(paths, plan.decode_values(raw)))}
+
+
+def _stat_stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def remove_stale_socket(path: Path) -> None:
+    """Delete a Unix socket left behind by a server that is gone.
+
+    Raises FileExistsError if ``path`` is not a socket, or if something is
+    still accepting connections on it.
+    """
+    if not path.exists() and not path.is_symlink():
+        return
+    if not path.is_socket():
+        raise FileExistsError(f"{path} exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(path))
+        except (ConnectionRefusedError, FileNotFoundError):
+            pass
+        else:
+            raise FileExistsError(f"{path} is in use by another server")
+    path.unlink(missing_ok=True)
+
+
+async def start_server(
+    service: DecodeService,
+    socket_path: Path | None = None,
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+) -> asyncio.AbstractServer:
+    """Listen on a Unix socket, or on TCP when no socket path is given.
+
+    Each connection speaks either newline-delimited JSON (one response line
+    per request line) or HTTP/1.1 with JSON ``POST`` bodies, chosen by its
+    first line.
+    """
+    handler = functools.partial(_handle_client, service)
+    if socket_path is not None:
+        return await asyncio.start_unix_server(
+            handler, path=str(socket_path), limit=_MAX_LINE,
+        )
+    return await asyncio.start_server(handler, host, port, limit=_MAX_LINE)
+
+
+async def serve(
+    service: DecodeService,
+    socket_path: Path | None = None,
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    reload_interval: float = 1.0,
+    on_ready: Callable[[asyncio.AbstractServer], None] = lambda s: None,
+) -> None:
+    """Run the server until it is cancelled or the process gets SIGTERM."""
+    server = await start_server(service, socket_path, host, port)
+    reloader = asyncio.create_task(watch_refbook(service, reload_interval))
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, stopped.set)
+        handles_sigterm = True
+    except (NotImplementedError, RuntimeError):
+        # No signal handling on Windows or outside the main thread.
+        handles_sigterm = False
+    on_ready(server)
+    try:
+        async with server:
+            await stopped.wait()
+    finally:
+        reloader.cancel()
+        if handles_sigterm:
+            loop.remove_signal_handler(signal.SIGTERM)
+
+
+async def watch_refbook(service: DecodeService, interval: float) -> None:
+    """Reload the refbook in a worker thread whenever it changes on disk."""
+    while True:
+        await asyncio.sleep(interval)
+        if not service.changed_on_disk():
+            continue
+        stamp = _stat_stamp(service.refbook_path)
+        try:
+            refbook = await asyncio.to_thread(
+                load_refbook, service.refbook_path,
+            )
+        except (OSError, ValueError) as e:
+            logger.warning("Keeping previous refbook, reload failed: %s", e)
+            service.stamp = stamp
+            continue
+        service.swap(refbook, stamp)
+        logger.info("Reloaded %s", service.refbook_path)
+
+
+async def _handle_client(
+    service: DecodeService,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+) -> None:
+    try:
+        line = await reader.readline()
+        if line.startswith((b"POST ", b"GET ")):
+            await _serve_http(service, reader, writer, line)
+            return
+        while line:
+            if line.strip():
+                response = service.handle_json(line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+            line = await reader.readline()
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _serve_http(
+    service: DecodeService,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    request_line: bytes,
+) -> None:
+    while request_line:
+        parts = request_line.decode("latin-1").split()
+        headers: dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+        if len(parts) != 3:
+            status, response = "400 Bad Request", {"error": "bad request"}
+        elif parts[0] != "POST":
+            status = "405 Method Not Allowed"
+            response = {"error": "use POST with a JSON body"}
+        else:
+            status, response = "200 OK", service.handle_json(body)
+
+        keep_alive = (
+            len(parts) == 3 and parts[2] == "HTTP/1.1"
+            and headers.get("connection", "").lower() != "close"
+        )
+        payload = json.dumps(response).encode()
+        head = (
+            f"HTTP/1.1 {status}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+        )
+        if not keep_alive:
+            head += "Connection: close\r\n"
+        writer.write(head.encode() + b"\r\n" + payload)
+        await writer.drain()
+        if not keep_alive:
+            return
+        request_line = await reader.readline()
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Iterator
+from typing import NamedTuple, TextIO
+
+from sv_ref.core.models import SVType
+from sv_ref.decoder import DecodePlan, compile_decoder, extend_bits
+
+_RANGE_RE = re.compile(r"\[[^\]]*\]$")
+
+
+class VcdVar(NamedTuple):
+    path: str
+    code: str
+    width: int
+
+
+class VcdHeader:
+    """The declaration section of a VCD file, up to $enddefinitions.
+
+    Commands are kept as token lists so the header can be written back out
+    with extra declarations spliced in.
+    """
+
+    def __init__(self, commands: list[list[str]]) -> None:
+        self.commands = commands
+        self.vars: list[VcdVar] = []
+        scopes: list[str] = []
+        for cmd in commands:
+            if cmd[0] == "$scope" and len(cmd) >= 4:
+                scopes.append(cmd[2])
+            elif cmd[0] == "$upscope" and scopes:
+                scopes.pop()
+            elif cmd[0] == "$var" and len(cmd) >= 6:
+                name = _RANGE_RE.sub("", cmd[4])
+                self.vars.append(VcdVar(
+                    ".".join([*scopes, name]), cmd[3], int(cmd[2]),
+                ))
+
+
+class MappedSignal(NamedTuple):
+    path: str
+    code: str
+    plan: DecodePlan
+
+
+def read_header(lines: Iterator[str]) -> VcdHeader:
+    commands: list[list[str]] = []
+    current: list[str] = []
+    for line in lines:
+        for tok in line.split():
+            current.append(tok)
+            if tok != "$end":
+                continue
+            commands.append(current)
+            current = []
+            if commands[-1][0] == "$enddefinitions":
+                return VcdHeader(commands)
+    raise ValueError("VCD header has no $enddefinitions")
+
+
+def map_signals(
+    header: VcdHeader, mapping: dict[str, SVType],
+) -> list[MappedSignal]:
+    by_path = {v.path: v for v in header.vars}
+    signals = []
+    for path, sv_type in mapping.items():
+        var = by_path.get(path)
+        if var is None:
+            raise ValueError(f"signal not found in VCD: {path}")
+        if var.width != sv_type.total_width:
+            raise ValueError(
+                f"signal {path} is {var.width} bits but {sv_type.name} "
+                f"is {sv_type.total_width} bits"
+            )
+        signals.append(MappedSignal(path, var.code, compile_decoder(sv_type)))
+    return signals
+
+
+def decode_changes(
+    lines: Iterable[str], signals: list[MappedSignal],
+) -> Iterator[dict]:
+    """Yield one record per value change of a mapped signal, in time order."""
+    paths = {s.path: [f.path for f in s.plan.fields] for s in signals}
+    for _, items in _scan(lines, signals):
+        if items is None:
+            continue
+        for item in items:
+            if isinstance(item, str):
+                continue
+            time, signal, bits = item
+            values = signal.plan.decode_bits(bits)
+            yield {
+                "time": time,
+                "signal": signal.path,
+                "value": _bits_to_hex(bits),
+                "fields": dict(zip(paths[signal.path], values)),
+            }
+
+
+def write_annotated(
+    header: VcdHeader,
+    lines: Iterable[str],
+    signals: list[MappedSignal],
+    out: TextIO,
+) -> None:
+    """Copy a VCD to ``out``, adding a sub-signal for every decoded field.
+
+    The fields of a mapped signal are declared in a scope named after it,
+    with nested structs as nested scopes.
+    """
+    used = {v.code for v in header.vars}
+    new_codes = _free_codes(used)
+    field_codes = {
+        signal.path: [next(new_codes) for _ in signal.plan.fields]
+        for signal in signals
+    }
+    by_path = {s.path: s for s in signals}
+
+    scopes: list[str] = []
+    for cmd in header.commands:
+        out.write(" ".join(cmd) + "\n")
+        if cmd[0] == "$scope" and len(cmd) >= 4:
+            scopes.append(cmd[2])
+        elif cmd[0] == "$upscope" and scopes:
+            scopes.pop()
+        elif cmd[0] == "$var" and len(cmd) >= 6:
+            path = ".".join([*scopes, _RANGE_RE.sub("", cmd[4])])
+            signal = by_path.pop(path, None)
+            if signal is not None:
+                _write_field_vars(
+                    out, _RANGE_RE.sub("", cmd[4]), signal.plan,
+                    field_codes[signal.path],
+                )
+
+    last: dict[str, list[str | None]] = {
+        s.path: [None] * len(s.plan.fields) for s in signals
+    }
+    for line, items in _scan(lines, signals):
+        if items is None:
+            out.write(line)
+            continue
+        for item in items:
+            if isinstance(item, str):
+                out.write(item + "\n")
+                continue
+            _, signal, bits = item
+            width = len(bits)
+            previous = last[signal.path]
+            codes = field_codes[signal.path]
+            for i, f in enumerate(signal.plan.fields):
+                field_bits = bits[width - f.offset - f.width:width - f.offset]
+                if field_bits == previous[i]:
+                    continue
+                previous[i] = field_bits
+                if f.width == 1:
+                    out.write(f"{field_bits}{codes[i]}\n")
+                else:
+                    out.write(f"b{field_bits} {codes[i]}\n")
+
+
+def _write_field_vars(
+    out: TextIO, name: str, plan: DecodePlan, codes: list[str],
+) -> None:
+    out.write(f"$scope module {name} $end\n")
+    depth = 0
+    for i, f in enumerate(plan.fields):
+        while depth > f.depth:
+            out.write("$upscope $end\n")
+            depth -= 1
+        rng = f" [{f.width - 1}:0]" if f.width > 1 else ""
+        out.write(f"$var wire {f.width} {codes[i]} {f.name}{rng} $end\n")
+        if i + 1 < len(plan.fields) and plan.fields[i + 1].depth > f.depth:
+            out.write(f"$scope module {f.name} $end\n")
+            depth += 1
+    out.write("$upscope $end\n" * (depth + 1))
+
+
+_Change = tuple[int, MappedSignal, str]
+
+
+def _scan(
+    lines: Iterable[str], signals: list[MappedSignal],
+) -> Iterator[tuple[str, list[str | _Change] | None]]:
+    """Walk the VCD body line by line, tracking the current time.
+
+    Lines without a change to a mapped signal come back with ``None`` so the
+    caller can pass them through untouched. Otherwise the line is returned as
+    chunks of its tokens, each mapped change followed by ``(time, signal,
+    bits)`` with ``bits`` extended to the signal's width.
+    """
+    by_code: dict[str, list[MappedSignal]] = {}
+    for s in signals:
+        by_code.setdefault(s.code, []).append(s)
+
+    time = 0
+    in_comment = False
+    for line in lines:
+        tokens = line.split()
+        items: list[str | _Change] | None = None
+        done = 0
+        i = 0
+        n = len(tokens)
+        while i < n:
+            tok = tokens[i]
+            if in_comment:
+                in_comment = tok != "$end"
+                i += 1
+                continue
+            c = tok[0]
+            if c == "#":
+                time = int(tok[1:])
+                i += 1
+                continue
+            if c in "bBrRsS":
+                code = tokens[i + 1] if i + 1 < n else ""
+                value = tok[1:]
+                end = i + 2
+                if c not in "bB":
+                    code = ""
+            elif c in "01xXzZ":
+                code = tok[1:]
+                value = c
+                end = i + 1
+            else:
+                in_comment = tok == "$comment"
+                i += 1
+                continue
+
+            hits = by_code.get(code)
+            if hits:
+                if items is None:
+                    items = []
+                items.append(" ".join(tokens[done:end]))
+                for s in hits:
+                    items.append((time, s, extend_bits(
+                        value.lower(), s.plan.sv_type.total_width,
+                    )))
+                done = end
+            i = end
+
+        if items is not None and done < n:
+            items.append(" ".join(tokens[done:]))
+        yield line, items
+
+
+def _bits_to_hex(bits: str) -> str:
+    hex_len = (len(bits) + 3) // 4
+    if not bits.strip("01"):
+        return f"{int(bits, 2):0{hex_len}X}"
+    bits = bits.rjust(hex_len * 4, "0")
+    digits = []
+    for i in range(0, len(bits), 4):
+        nibble = bits[i:i + 4]
+        if "x" in nibble:
+            digits.append("X")
+        elif "z" in nibble:
+            digits.append("Z")
+        else:
+            digits.append(f"{int(nibble, 2):X}")
+    return "".join(digits)
+
+
+def _free_codes(used: set[str]) -> Iterator[str]:
+    # Identifier codes are strings over the printable ASCII range '!'..'~'.
+    n = 0
+    while True:
+        code = ""
+        k = n
+        while True:
+            k, r = divmod(k, 94)
+            code = chr(33 + r) + code
+            if k == 0:
+                break
+            k -= 1
+        n += 1
+        if code not in used:
+            yield code
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from sv_ref.core.analyzer import IncrementalAnalyzer
+from sv_ref.core.models import Refbook
+from sv_ref.generator.writer import write_outputs
+
+
+@dataclass
+class RebuildReport:
+    changed: list[Path]
+    outputs: list[Path]
+    type_count: int
+    seconds: float
+    error: str | None = None
+
+
+def rebuild(
+    analyzer: IncrementalAnalyzer,
+    output_dir: Path,
+    json_output: bool = True,
+    html_output: bool = True,
+    inline_types: bool = False,
+    previous: Refbook | None = None,
+    compress_html: bool = False,
+    viewer: bool = False,
+) -> tuple[Refbook, RebuildReport]:
+    start = time.perf_counter()
+    refbook, changed = analyzer.update()
+
+    outputs: list[Path] = []
+    if previous is None or _types_differ(previous, refbook):
+        outputs = write_outputs(
+            refbook, output_dir, json_output, html_output, inline_types,
+            compress_html, viewer,
+        )
+    else:
+        refbook = previous
+
+    report = RebuildReport(
+        changed=changed,
+        outputs=outputs,
+        type_count=len(refbook.types),
+        seconds=time.perf_counter() - start,
+    )
+    return refbook, report
+
+
+def watch(
+    analyzer: IncrementalAnalyzer,
+    output_dir: Path,
+    on_rebuild: Callable[[RebuildReport], None],
+    json_output: bool = True,
+    html_output: bool = True,
+    inline_types: bool = False,
+    compress_html: bool = False,
+    viewer: bool = False,
+    poll_interval: float = 0.25,
+    debounce: float = 0.2,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> None:
+    refbook, report = rebuild(
+        analyzer, output_dir, json_output, html_output, inline_types,
+        compress_html=compress_html, viewer=viewer,
+    )
+    on_rebuild(report)
+    failed: list[tuple[int, int] | None] | None = None
+
+    while not should_stop():
+        time.sleep(poll_interval)
+        if not analyzer.stale_files() or _snapshot(analyzer) == failed:
+            continue
+
+        # Editors often write a file in several steps; wait for the burst
+        # of saves to settle before rebuilding.
+        snapshot = _snapshot(analyzer)
+        while True:
+            time.sleep(debounce)
+            current = _snapshot(analyzer)
+            if current == snapshot:
+                break
+            snapshot = current
+
+        start = time.perf_counter()
+        try:
+            refbook, report = rebuild(
+                analyzer, output_dir, json_output, html_output, inline_types,
+                refbook, compress_html, viewer,
+            )
+        except OSError as e:
+            # A source went missing (branch switch, save-by-rename); keep
+            # the last good outputs and retry once the files change again.
+            failed = snapshot
+            report = RebuildReport(
+                changed=[], outputs=[], type_count=len(refbook.types),
+                seconds=time.perf_counter() - start, error=str(e),
+            )
+        else:
+            failed = None
+        on_rebuild(report)
+
+
+def _snapshot(analyzer: IncrementalAnalyzer) -> list[tuple[int, int] | None]:
+    stamps = []
+    for path in analyzer.watched_paths():
+        try:
+            st = path.stat()
+        except OSError:
+            stamps.append(None)
+            continue
+        stamps.append((st.st_mtime_ns, st.st_size))
+    return stamps
+
+
+def _types_differ(old: Refbook, new: Refbook) -> bool:
+    return old.types != new.types
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from pathlib import Path
 
 import pytest
@@ -33,3 +34,10 @@ def wide_types_refbook() -> Refbook:
 @pytest.fixture
 def module_types_refbook() -> Refbook:
     return analyze([SAMPLES_DIR / "module_types.sv"])
+
+
+@pytest.fixture
+def basic_refbook_path(basic_types_refbook: Refbook, tmp_path: Path) -> Path:
+    path = tmp_path / "refbook.json"
+    path.write_text(json.dumps(basic_types_refbook.model_dump(), indent=2))
+    return path
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import pytest
+
 from sv_ref import __version__
 from sv_ref.core.analyzer import analyze
 from sv_ref.core.models import Refbook, TypeKind
@@ -171,3 +173,67 @@ def test_analyze_module_and_package_together():
     packages = {t.package for t in refbook.types}
     assert "test_pkg" in packages
     assert "merge_phase_t1" in packages
+
+
+def test_analyze_shares_nested_definitions():
+    refbook = analyze([
+        SAMPLES_DIR / "basic_types.sv",
+        SAMPLES_DIR / "nested.sv",
+    ])
+    by_name = {t.name: t for t in refbook.types}
+    data = by_name["outer_t"].fields[0]
+    status = by_name["packet_t"].fields[1]
+    assert data.inner_fields[0] is by_name["inner_t"].fields[0]
+    assert status.enum_members[0] is by_name["state_e"].members[0]
+
+
+def test_analyze_repeated_instances(tmp_path: Path):
+    sv = tmp_path / "hier.sv"
+    sv.write_text("""\
+module leaf #(parameter int W = 4) ();
+    typedef struct packed { logic [W-1:0] a; logic b; } leaf_t;
+endmodule
+module mid;
+    typedef enum logic { OFF, ON } mid_e;
+    leaf #(.W(8)) u0 ();
+    leaf #(.W(8)) u1 ();
+    leaf #(.W(16)) u2 ();
+endmodule
+module top;
+    mid m0 ();
+    mid m1 ();
+endmodule
+""")
+    refbook = analyze([sv])
+    keys = [(t.package, t.name) for t in refbook.types]
+    assert keys == [("mid", "mid_e"), ("leaf", "leaf_t")]
+    leaf_t = refbook.types[1]
+    assert leaf_t.total_width == 9
+
+
+def test_analyze_packages_only():
+    refbook = analyze(
+        [SAMPLES_DIR / "basic_types.sv", SAMPLES_DIR / "module_types.sv"],
+        packages_only=True,
+    )
+    assert {t.package for t in refbook.types} == {"test_pkg"}
+
+
+def test_analyze_top_limits_instance_walk(tmp_path: Path):
+    sv = tmp_path / "tops.sv"
+    sv.write_text("""\
+module a_top;
+    typedef enum logic { A0, A1 } a_e;
+endmodule
+module b_top;
+    typedef enum logic { B0, B1 } b_e;
+endmodule
+""")
+    refbook = analyze([sv, SAMPLES_DIR / "basic_types.sv"], top=["b_top"])
+    names = {t.name for t in refbook.types}
+    assert names == {"b_e", "state_e", "packet_t"}
+
+
+def test_analyze_top_not_found():
+    with pytest.raises(ValueError, match="no_such_top"):
+        analyze([SAMPLES_DIR / "module_types.sv"], top=["no_such_top"])
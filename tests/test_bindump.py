@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import json
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from sv_ref.bindump import RecordDump
+from sv_ref.main import app
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def packet_dump(tmp_path: Path) -> Path:
+    # 4-byte header, then 16-bit little-endian records padded to 4 bytes.
+    path = tmp_path / "ring.bin"
+    path.write_bytes(b"HDR!" + b"".join(
+        v.to_bytes(2, "little") + b"\x00\x00"
+        for v in (0xAB8D, 0x0040, 0x1234)
+    ) + b"\xff")
+    return path
+
+
+def test_record_dump_random_access(packet_dump: Path):
+    with closing(RecordDump(packet_dump, 2, stride=4, offset=4)) as dump:
+        assert len(dump) == 3
+        assert dump[2] == 0x1234
+        assert dump[-3] == 0xAB8D
+        assert dump.record_offset(1) == 8
+        assert list(dump.records(1, 5)) == [(1, 0x0040), (2, 0x1234)]
+        with pytest.raises(IndexError):
+            dump[3]
+
+
+def test_record_dump_big_endian(tmp_path: Path):
+    path = tmp_path / "be.bin"
+    path.write_bytes(bytes.fromhex("0102030405"))
+    with closing(RecordDump(path, 2, byteorder="big")) as dump:
+        assert list(dump.records()) == [(0, 0x0102), (1, 0x0304)]
+
+
+def test_record_dump_empty_file(tmp_path: Path):
+    path = tmp_path / "empty.bin"
+    path.write_bytes(b"")
+    with closing(RecordDump(path, 4)) as dump:
+        assert len(dump) == 0
+        assert list(dump.records()) == []
+
+
+def test_record_dump_stride_too_small(tmp_path: Path):
+    path = tmp_path / "x.bin"
+    path.write_bytes(b"\x00" * 8)
+    with pytest.raises(ValueError, match="stride"):
+        RecordDump(path, 4, stride=2)
+
+
+def test_decode_bin_table(basic_refbook_path: Path, packet_dump: Path):
+    result = runner.invoke(app, [
+        "decode-bin",
+        str(basic_refbook_path),
+        "packet_t",
+        str(packet_dump),
+        "--offset", "4",
+        "--stride", "4",
+    ])
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [
+        "index value header status payload",
+        "    0 AB8D  171    ERR    13",
+        "    1 0040  0      BUSY   0",
+        "    2 1234  18     IDLE   52",
+    ]
+
+
+def test_decode_bin_jsonl_slice(basic_refbook_path: Path, packet_dump: Path):
+    result = runner.invoke(app, [
+        "decode-bin",
+        str(basic_refbook_path),
+        "packet_t",
+        str(packet_dump),
+        "--offset", "4",
+        "--stride", "4",
+        "--start", "1",
+        "--count", "1",
+        "--format", "jsonl",
+    ])
+    assert result.exit_code == 0
+    assert [json.loads(line) for line in result.output.splitlines()] == [
+        {"index": 1, "offset": 8, "value": "0040",
+         "fields": {"header": "0", "status": "BUSY", "payload": "0"}},
+    ]
+
+
+def test_decode_bin_bad_stride(basic_refbook_path: Path, packet_dump: Path):
+    result = runner.invoke(app, [
+        "decode-bin",
+        str(basic_refbook_path),
+        "packet_t",
+        str(packet_dump),
+        "--stride", "1",
+    ])
+    assert result.exit_code != 0
+    assert "stride" in result.output
+
+
+def test_decode_bin_masks_padding_bits(
+    basic_refbook_path: Path, tmp_path: Path,
+):
+    # state_e is 2 bits wide, so the upper bits of each byte are padding.
+    dump = tmp_path / "states.bin"
+    dump.write_bytes(bytes([0xFE, 0x01]))
+    result = runner.invoke(app, [
+        "decode-bin", str(basic_refbook_path), "state_e", str(dump),
+    ])
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [
+        "index value state_e",
+        "    0 2     ERR",
+        "    1 1     BUSY",
+    ]
+
+    result = runner.invoke(app, [
+        "decode-bin", str(basic_refbook_path), "state_e", str(dump),
+        "--count", "1", "--format", "jsonl",
+    ])
+    assert json.loads(result.output)["value"] == "2"
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from sv_ref.core import analyzer
+from sv_ref.core.analyzer import analyze
+from sv_ref.core.cache import AnalysisCache
+
+SAMPLES_DIR = Path(__file__).parent / "samples"
+
+
+@pytest.fixture
+def include_design(tmp_path: Path) -> tuple[Path, Path]:
+    inc = tmp_path / "inc"
+    inc.mkdir()
+    (inc / "defs.svh").write_text(
+        "typedef enum logic [1:0] { A=0, B=1 } ab_e;\n"
+    )
+    main_file = tmp_path / "main.sv"
+    main_file.write_text(
+        '`include "defs.svh"\n'
+        "package inc_pkg;\n"
+        "    typedef struct packed { ab_e sel; logic [5:0] data; } frame_t;\n"
+        "endpackage\n"
+    )
+    return main_file, inc
+
+
+def _fail_compile(*args, **kwargs):
+    raise AssertionError("pyslang should not be called on a cache hit")
+
+
+def test_cache_hit_skips_pyslang(tmp_path: Path, monkeypatch):
+    cache = AnalysisCache(tmp_path / "cache")
+    sources = [SAMPLES_DIR / "basic_types.sv", SAMPLES_DIR / "nested.sv"]
+
+    first = analyze(sources, cache=cache)
+    monkeypatch.setattr(analyzer, "_compile", _fail_compile)
+    second = analyze(sources, cache=cache)
+
+    assert second.model_dump()["types"] == first.model_dump()["types"]
+    assert second.meta.source_files == first.meta.source_files
+
+
+def test_cache_invalidated_by_include_change(include_design, tmp_path: Path):
+    main_file, inc = include_design
+    cache = AnalysisCache(tmp_path / "cache")
+
+    first = analyze([main_file], [inc], cache=cache)
+    frame = next(t for t in first.types if t.name == "frame_t")
+    assert len(frame.fields[0].enum_members) == 2
+
+    (inc / "defs.svh").write_text(
+        "typedef enum logic [1:0] { A=0, B=1, C=2 } ab_e;\n"
+    )
+    second = analyze([main_file], [inc], cache=cache)
+    frame = next(t for t in second.types if t.name == "frame_t")
+    assert len(frame.fields[0].enum_members) == 3
+
+
+def test_cache_keyed_by_include_dirs(include_design, tmp_path: Path):
+    main_file, inc = include_design
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "defs.svh").write_text(
+        "typedef enum logic [1:0] { X=0, Y=1, Z=2 } ab_e;\n"
+    )
+    cache = AnalysisCache(tmp_path / "cache")
+
+    analyze([main_file], [inc], cache=cache)
+    refbook = analyze([main_file], [other], cache=cache)
+    frame = next(t for t in refbook.types if t.name == "frame_t")
+    assert [m.name for m in frame.fields[0].enum_members] == ["X", "Y", "Z"]
+
+
+def test_cache_invalidated_by_shadowing_header(
+    include_design, tmp_path: Path, monkeypatch,
+):
+    main_file, inc = include_design
+    early = tmp_path / "early"
+    early.mkdir()
+    cache = AnalysisCache(tmp_path / "cache")
+    analyze([main_file], [early, inc], cache=cache)
+
+    # Still a hit while nothing on the include path changed.
+    with monkeypatch.context() as m:
+        m.setattr(analyzer, "_compile", _fail_compile)
+        analyze([main_file], [early, inc], cache=cache)
+
+    (early / "defs.svh").write_text(
+        "typedef enum logic [1:0] { X=0, Y=1, Z=2 } ab_e;\n"
+    )
+    refbook = analyze([main_file], [early, inc], cache=cache)
+    frame = next(t for t in refbook.types if t.name == "frame_t")
+    assert [m.name for m in frame.fields[0].enum_members] == ["X", "Y", "Z"]
+
+
+def test_cache_invalidated_by_created_include(tmp_path: Path):
+    main_file = tmp_path / "main.sv"
+    main_file.write_text(
+        "package late_pkg;\n"
+        '    `include "late.svh"\n'
+        "    typedef struct packed { logic [3:0] a; } base_t;\n"
+        "endpackage\n"
+    )
+    cache = AnalysisCache(tmp_path / "cache")
+    first = analyze([main_file], cache=cache)
+    assert {t.name for t in first.types} == {"base_t"}
+
+    (tmp_path / "late.svh").write_text(
+        "typedef enum logic { OFF, ON } onoff_e;\n"
+    )
+    second = analyze([main_file], cache=cache)
+    assert {t.name for t in second.types} == {"base_t", "onoff_e"}
+
+
+def test_cache_lru_eviction(tmp_path: Path):
+    cache_dir = tmp_path / "cache"
+    cache = AnalysisCache(cache_dir, max_bytes=0)
+
+    analyze([SAMPLES_DIR / "basic_types.sv"], cache=cache)
+    assert list(cache_dir.glob("*.json")) == []
+
+    cache.max_bytes = 1 << 20
+    analyze([SAMPLES_DIR / "basic_types.sv"], cache=cache)
+    analyze([SAMPLES_DIR / "nested.sv"], cache=cache)
+    assert len(list(cache_dir.glob("*.json"))) == 2
@@ -176,3 +176,80 @@ def test_generate_no_files_no_filelist():
     result = runner.invoke(app, ["generate"])
     assert result.exit_code != 0
     assert "provide" in result.output.lower() or "error" in result.output.lower()
+
+
+def test_generate_packages_only(tmp_path: Path):
+    result = runner.invoke(app, [
+        "generate",
+        str(SAMPLES_DIR / "basic_types.sv"),
+        str(SAMPLES_DIR / "module_types.sv"),
+        "--packages-only",
+        "--json-only",
+        "-o", str(tmp_path),
+    ])
+    assert result.exit_code == 0
+    data = json.loads((tmp_path / "refbook.json").read_text())
+    assert {t["package"] for t in data["types"]} == {"test_pkg"}
+
+
+def test_generate_top_not_found(tmp_path: Path):
+    result = runner.invoke(app, [
+        "generate",
+        str(SAMPLES_DIR / "module_types.sv"),
+        "--top", "missing_top",
+        "-o", str(tmp_path),
+    ])
+    assert result.exit_code != 0
+    assert "missing_top" in result.output
+
+
+def test_generate_shared_types_default(tmp_path: Path):
+    result = runner.invoke(app, [
+        "generate",
+        str(SAMPLES_DIR / "nested.sv"),
+        "--json-only",
+        "-o", str(tmp_path),
+    ])
+    assert result.exit_code == 0
+    data = json.loads((tmp_path / "refbook.json").read_text())
+    assert data["meta"]["schema_version"] == 2
+    outer = next(t for t in data["types"] if t["name"] == "outer_t")
+    assert outer["fields"][0]["type_ref"] == "test_pkg::inner_t"
+    assert outer["fields"][0]["inner_fields"] is None
+
+
+def test_generate_inline_types(tmp_path: Path):
+    result = runner.invoke(app, [
+        "generate",
+        str(SAMPLES_DIR / "nested.sv"),
+        "--json-only",
+        "--inline-types",
+        "-o", str(tmp_path),
+    ])
+    assert result.exit_code == 0
+    data = json.loads((tmp_path / "refbook.json").read_text())
+    assert "schema_version" not in data["meta"]
+    outer = next(t for t in data["types"] if t["name"] == "outer_t")
+    assert "type_ref" not in outer["fields"][0]
+    assert len(outer["fields"][0]["inner_fields"]) == 2
+
+
+def test_generate_viewer(tmp_path: Path):
+    args = ["generate", str(SAMPLES_DIR / "basic_types.sv"),
+            "--viewer", "-o", str(tmp_path)]
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0
+    html = (tmp_path / "index.html").read_text()
+    assert 'data-src="refbook.json"' in html
+    assert "packet_t" not in html
+
+    # A different refbook leaves the viewer as it was.
+    result = runner.invoke(app, ["generate", str(SAMPLES_DIR / "nested.sv"),
+                                 "--viewer", "-o", str(tmp_path)])
+    assert result.exit_code == 0
+    assert "index.html" not in result.output
+    assert (tmp_path / "index.html").read_text() == html
+
+    result = runner.invoke(app, [*args, "--compress-html"])
+    assert result.exit_code != 0
+    assert "mutually exclusive" in result.output.lower()
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 import json
+import sys
 from pathlib import Path
 
 import pytest
 from typer.testing import CliRunner
 
-from sv_ref.core.models import Refbook
-from sv_ref.decoder import decode_hex, find_type, load_refbook
+from sv_ref.core.models import FieldType, Refbook, StructField, SVType, TypeKind
+from sv_ref.decoder import (
+    compile_decoder,
+    decode_array,
+    decode_hex,
+    find_type,
+    load_refbook,
+)
 from sv_ref.main import app
 
 runner = CliRunner()
@@ -15,13 +22,6 @@ runner = CliRunner()
 SAMPLES_DIR = Path(__file__).parent / "samples"
 
 
-@pytest.fixture
-def basic_refbook_path(basic_types_refbook: Refbook, tmp_path: Path) -> Path:
-    path = tmp_path / "refbook.json"
-    path.write_text(json.dumps(basic_types_refbook.model_dump(), indent=2))
-    return path
-
-
 @pytest.fixture
 def nested_refbook_path(nested_refbook: Refbook, tmp_path: Path) -> Path:
     path = tmp_path / "refbook.json"
@@ -82,6 +82,24 @@ def test_decode_struct(basic_types_refbook: Refbook):
     assert payload["decoded"] == "13"
 
 
+def test_decode_ambiguous_type(tmp_path: Path):
+    meta = {"version": "0.1.0", "generated_at": "", "source_files": []}
+    types = [
+        {"name": "dup_e", "kind": "enum", "total_width": 1, "package": pkg,
+         "members": [{"name": "A", "value": 0}]}
+        for pkg in ("p_pkg", "q_pkg")
+    ]
+    path = tmp_path / "refbook.json"
+    path.write_text(json.dumps({"meta": meta, "types": types}))
+
+    result = runner.invoke(app, ["decode", str(path), "dup_e", "0"])
+    assert result.exit_code != 0
+    assert "p_pkg::dup_e, q_pkg::dup_e" in result.output
+
+    result = runner.invoke(app, ["decode", str(path), "q_pkg::dup_e", "0"])
+    assert result.exit_code == 0
+
+
 def test_decode_enum(basic_types_refbook: Refbook):
     # packet_t status field: offset=6, width=2
     # 0xAB8D -> bits[7:6] = 0b10 = 2 -> ERR
@@ -94,6 +112,15 @@ def test_decode_enum(basic_types_refbook: Refbook):
     assert status["decoded"] == "ERR"
 
 
+def test_decode_enum_type(basic_types_refbook: Refbook):
+    sv_type = find_type(basic_types_refbook, "state_e")
+    rows = decode_hex(sv_type, "2")
+    assert rows == [{
+        "name": "state_e", "bits": "[1:0]", "hex": "0x2", "decoded": "ERR",
+        "depth": 0,
+    }]
+
+
 def test_decode_type_not_found(basic_refbook_path: Path):
     result = runner.invoke(app, [
         "decode",
@@ -162,3 +189,145 @@ def test_decode_cli_output(basic_refbook_path: Path):
     assert "16 bits" in result.output
     assert "header" in result.output
     assert "ERR" in result.output
+
+
+def test_load_refbook_shared_types(nested_refbook: Refbook, tmp_path: Path):
+    path = tmp_path / "refbook.json"
+    shared = nested_refbook.with_shared_types()
+    path.write_text(json.dumps(shared.model_dump(), indent=2))
+
+    rb = load_refbook(path)
+    sv_type = find_type(rb, "outer_t")
+    rows = decode_hex(sv_type, "12345678")
+    assert [r["name"] for r in rows] == ["data", "a", "b", "extra"]
+    assert rows[1]["hex"] == "0x12"
+
+
+def test_compile_decoder_cached(basic_types_refbook: Refbook):
+    sv_type = find_type(basic_types_refbook, "packet_t")
+    plan = compile_decoder(sv_type)
+    assert compile_decoder(sv_type) is plan
+    assert [f.bits for f in plan.fields] == ["[15:8]", "[7:6]", "[5:0]"]
+    assert plan.fields[1].enum_names == {0: "IDLE", 1: "BUSY", 2: "ERR"}
+
+
+def test_compile_decoder_flattens_nested(nested_refbook: Refbook):
+    plan = compile_decoder(find_type(nested_refbook, "outer_t"))
+    assert [(f.path, f.offset, f.depth) for f in plan.fields] == [
+        ("data", 16, 0),
+        ("data.a", 24, 1),
+        ("data.b", 16, 1),
+        ("extra", 0, 0),
+    ]
+    # Bit labels stay relative to the parent, as in decode_hex rows.
+    assert plan.fields[1].bits == "[15:8]"
+    assert plan.decode_values(0x12345678) == ["4660", "18", "52", "22136"]
+
+
+def test_decode_batch_jsonl(basic_refbook_path: Path, tmp_path: Path):
+    values = tmp_path / "values.txt"
+    values.write_text("AB8D\n\n0x0040\n")
+    result = runner.invoke(app, [
+        "decode-batch",
+        str(basic_refbook_path),
+        "packet_t",
+        "-i", str(values),
+    ])
+    assert result.exit_code == 0
+    lines = [json.loads(line) for line in result.output.splitlines()]
+    assert lines == [
+        {"value": "AB8D",
+         "fields": {"header": "171", "status": "ERR", "payload": "13"}},
+        {"value": "0x0040",
+         "fields": {"header": "0", "status": "BUSY", "payload": "0"}},
+    ]
+
+
+def test_decode_batch_csv_stdin(nested_refbook_path: Path):
+    result = runner.invoke(app, [
+        "decode-batch",
+        str(nested_refbook_path),
+        "outer_t",
+        "--format", "csv",
+    ], input="12345678\n")
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [
+        "value,data,data.a,data.b,extra",
+        "12345678,4660,18,52,22136",
+    ]
+
+
+def test_decode_batch_invalid_value(basic_refbook_path: Path):
+    result = runner.invoke(app, [
+        "decode-batch",
+        str(basic_refbook_path),
+        "packet_t",
+        "--format", "tsv",
+    ], input="AB8D\nXYZ\n")
+    assert result.exit_code != 0
+    assert "header\tstatus\tpayload" in result.output
+    assert "line 2" in result.output
+
+
+def _straddle_type() -> SVType:
+    # 72-bit struct whose middle field crosses the 64-bit word boundary.
+    return SVType(
+        name="straddle_t",
+        kind=TypeKind.STRUCT,
+        total_width=72,
+        fields=[
+            StructField(name="hi", width=4, offset=68,
+                        field_type=FieldType(name="logic[3:0]")),
+            StructField(name="mid", width=16, offset=52,
+                        field_type=FieldType(name="logic[15:0]",
+                                             signed=True)),
+            StructField(name="lo", width=52, offset=0,
+                        field_type=FieldType(name="logic[51:0]")),
+        ],
+    )
+
+
+def test_decode_array_numpy(basic_types_refbook: Refbook):
+    np = pytest.importorskip("numpy")
+    sv_type = find_type(basic_types_refbook, "packet_t")
+    values = np.array([0xAB8D, 0x00C0, 0x0040], dtype=np.uint64)
+
+    columns = decode_array(sv_type, values)
+    assert columns["header"].tolist() == [171, 0, 0]
+    assert columns["status"].tolist() == ["ERR", None, "BUSY"]
+    assert columns["payload"].dtype == np.uint64
+
+
+def test_decode_array_numpy_wide_words():
+    np = pytest.importorskip("numpy")
+    value = (0xA << 68) | (0x8001 << 52) | 0x12345
+    words = np.array(
+        [[value & (2**64 - 1), value >> 64]], dtype=np.uint64,
+    )
+
+    columns = decode_array(_straddle_type(), words)
+    assert columns["hi"].tolist() == [0xA]
+    assert columns["mid"].tolist() == [0x8001 - 0x10000]
+    assert columns["mid"].dtype == np.int64
+    assert columns["lo"].tolist() == [0x12345]
+
+
+def test_decode_array_numpy_wide_type_needs_words():
+    np = pytest.importorskip("numpy")
+    with pytest.raises(ValueError, match="straddle_t is 72 bits wide"):
+        decode_array(_straddle_type(), np.array([1, 2], dtype=np.uint64))
+    with pytest.raises(ValueError, match="2-D array of uint64 words"):
+        decode_array(_straddle_type(), [1 << 70])
+
+
+def test_decode_array_without_numpy(monkeypatch, signed_refbook: Refbook):
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    sv_type = find_type(signed_refbook, "mixed_t")
+    assert decode_array(sv_type, [0xFF00, 0x7F01]) == {
+        "signed_val": [-1, 127],
+        "unsigned_val": [0, 1],
+    }
+
+    value = (0xA << 68) | (0x8001 << 52) | 0x12345
+    columns = decode_array(_straddle_type(), [[value & (2**64 - 1), value >> 64]])
+    assert columns == {"hi": [0xA], "mid": [-0x7FFF], "lo": [0x12345]}
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from sv_ref.core.models import Refbook
+from sv_ref.decoder import extend_bits, find_type
+from sv_ref.gtkwave import TranslateFilter, run_filter
+from sv_ref.main import app
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def packet_filter(basic_types_refbook: Refbook) -> TranslateFilter:
+    return TranslateFilter(find_type(basic_types_refbook, "packet_t"))
+
+
+@pytest.mark.parametrize("value", [
+    "AB8D", "ab8d\n", "16'hAB8D", "'b1010101110001101", "'d43917",
+])
+def test_translate_value_formats(packet_filter: TranslateFilter, value: str):
+    assert packet_filter.translate(value) == "header=171 status=ERR payload=13"
+
+
+def test_translate_prefix_in_own_radix(packet_filter: TranslateFilter):
+    assert packet_filter.translate("0xAB8D") == "header=171 status=ERR payload=13"
+    assert TranslateFilter(packet_filter.plan.sv_type, radix=2).translate(
+        "0b0000000001000000",
+    ) == "header=0 status=BUSY payload=0"
+
+
+def test_translate_enum_type(basic_types_refbook: Refbook):
+    filt = TranslateFilter(find_type(basic_types_refbook, "state_e"))
+    assert filt.translate("2") == "ERR"
+    assert filt.translate("3") == "3"
+    assert filt.translate("x") == "x"
+    hex_filter = TranslateFilter(
+        find_type(basic_types_refbook, "state_e"), hex_fields=True,
+    )
+    assert hex_filter.translate("1") == "BUSY"
+    assert hex_filter.translate("3") == "0x3"
+
+
+def test_translate_unknown_bits(packet_filter: TranslateFilter):
+    assert packet_filter.translate("ABxD") == "header=171 status=x payload=x"
+    assert packet_filter.translate("ZZZZ") == "header=z status=z payload=z"
+    # A leading x extends across the missing high digits.
+    assert packet_filter.translate("'bx0") == "header=x status=x payload=x"
+
+
+def test_translate_passes_through_garbage(packet_filter: TranslateFilter):
+    assert packet_filter.translate("") == ""
+    assert packet_filter.translate("not-a-value") == "not-a-value"
+
+
+def test_translate_binary_radix_and_hex_fields(basic_types_refbook: Refbook):
+    packet_t = find_type(basic_types_refbook, "packet_t")
+    assert TranslateFilter(packet_t, radix=2).translate("0000000001000000") == (
+        "header=0 status=BUSY payload=0"
+    )
+    hex_filter = TranslateFilter(packet_t, hex_fields=True)
+    assert hex_filter.translate("AB8D") == "header=0xAB status=ERR payload=0x0D"
+    assert hex_filter.translate("ABxD") == "header=0xAB status=x payload=x"
+
+
+def test_translate_nested_shows_leaves(nested_refbook: Refbook):
+    filt = TranslateFilter(find_type(nested_refbook, "outer_t"))
+    assert filt.translate("12345678") == "data.a=18 data.b=52 extra=22136"
+
+
+def test_extend_bits():
+    assert extend_bits("101", 5) == "00101"
+    assert extend_bits("x1", 4) == "xxx1"
+    assert extend_bits("z", 3) == "zzz"
+    assert extend_bits("110011", 4) == "0011"
+
+
+def test_run_filter_one_line_per_value(packet_filter: TranslateFilter):
+    out = io.StringIO()
+    run_filter(packet_filter, io.StringIO("AB8D\n\n0040\n"), out)
+    assert out.getvalue().splitlines() == [
+        "header=171 status=ERR payload=13",
+        "",
+        "header=0 status=BUSY payload=0",
+    ]
+
+
+def test_gtkwave_filter_cli(basic_types_refbook: Refbook, tmp_path: Path):
+    path = tmp_path / "refbook.json"
+    path.write_text(json.dumps(basic_types_refbook.model_dump()))
+    result = runner.invoke(
+        app, ["gtkwave-filter", str(path), "packet_t", "--hex"],
+        input="AB8D\nXXXX\n",
+    )
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [
+        "header=0xAB status=ERR payload=0x0D",
+        "header=x status=x payload=x",
+    ]
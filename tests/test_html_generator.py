@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import base64
+import gzip
+import json
 import re
+from pathlib import Path
 
 from sv_ref.core.models import Refbook
-from sv_ref.generator.html import generate_html
+from sv_ref.generator.html import generate_html, generate_viewer_html, iter_html
+from sv_ref.generator.writer import write_outputs
 
 
 def test_html_generation(basic_types_refbook: Refbook) -> None:
@@ -34,14 +39,16 @@ def test_html_self_contained(basic_types_refbook: Refbook) -> None:
 
 def test_html_bigint_helpers(basic_types_refbook: Refbook) -> None:
     html = generate_html(basic_types_refbook)
-    assert "binToBigInt" in html
+    assert "hexToBigInt" in html
     assert "bigIntToHex" in html
+    # Fields are extracted from one parsed BigInt, not from bit strings.
+    assert "compilePlan" in html
+    assert "hexToBin" not in html
 
 
 def test_html_no_raw_parseint_binary(basic_types_refbook: Refbook) -> None:
     html = generate_html(basic_types_refbook)
     # No parseInt with binary radix (2) -- these should all be BigInt now
-    # Allowed: parseInt(hex[i], 16) for single hex chars in hexToBin
     # Allowed: parseInt(items[i].dataset.index) for sidebar selection
     matches = re.findall(r"parseInt\([^)]*,\s*2\)", html)
     assert matches == [], f"Found raw parseInt with binary radix: {matches}"
@@ -66,6 +73,14 @@ def test_html_theme_toggle(basic_types_refbook: Refbook) -> None:
     assert "theme-toggle" in html
 
 
+def test_html_virtualized_sidebar(basic_types_refbook: Refbook) -> None:
+    html = generate_html(basic_types_refbook)
+    assert "type-list-inner" in html
+    assert "ROW_HEIGHT" in html
+    assert "requestAnimationFrame" in html
+    assert "pkg-group" not in html
+
+
 def test_html_keyboard_nav(basic_types_refbook: Refbook) -> None:
     html = generate_html(basic_types_refbook)
     assert "keydown" in html
@@ -87,6 +102,72 @@ def test_html_register_map(basic_types_refbook: Refbook) -> None:
     assert "renderRegisterMap" in html
 
 
+def test_html_incremental_decode(basic_types_refbook: Refbook) -> None:
+    html = generate_html(basic_types_refbook)
+    # The content pane is built once per type; keystrokes patch cells.
+    assert "function renderType()" in html
+    assert "updateStructCells" in html
+    assert html.count("setupHoverInteractions();") == 1
+
+
+def test_html_bulk_decode(basic_types_refbook: Refbook) -> None:
+    html = generate_html(basic_types_refbook)
+    assert 'id="bulk-toggle"' in html
+    # The worker is built from inline source, keeping the page one file.
+    assert "new Worker(URL.createObjectURL(new Blob(" in html
+    assert "function bulkWorker(scope)" in html
+
+
 def test_html_esc_html(basic_types_refbook: Refbook) -> None:
     html = generate_html(basic_types_refbook)
     assert "escHtml" in html
+
+
+def test_html_resolves_type_refs(nested_refbook: Refbook) -> None:
+    html = generate_html(nested_refbook)
+    assert "resolveTypeRefs" in html
+    assert '"type_ref": "test_pkg::inner_t"' in html
+
+
+def test_html_compressed_payload(nested_refbook: Refbook) -> None:
+    html = generate_html(nested_refbook, compress=True)
+    match = re.search(
+        r'<script type="application/octet-stream" id="refbook-data" '
+        r'data-encoding="gzip\+base64">\s*([A-Za-z0-9+/=]+)\s*</script>',
+        html,
+    )
+    assert match
+    data = json.loads(gzip.decompress(base64.b64decode(match.group(1))))
+    assert data == nested_refbook.with_shared_types().model_dump()
+    assert "DecompressionStream" in html
+    assert '<script type="application/json"' not in html
+    assert html == generate_html(nested_refbook, compress=True)
+
+
+def test_html_streamed_payload(nested_refbook: Refbook, tmp_path: Path) -> None:
+    chunks = list(iter_html(nested_refbook))
+    assert len(chunks) > 3
+    html = "".join(chunks)
+    match = re.search(
+        r'<script type="application/json" id="refbook-data">\n(.*?)\n</script>',
+        html, re.DOTALL,
+    )
+    assert match
+    data = nested_refbook.with_shared_types().model_dump()
+    assert match.group(1) == json.dumps(data, indent=2)
+
+    write_outputs(nested_refbook, tmp_path, json_output=False)
+    assert (tmp_path / "index.html").read_text() == html
+    write_outputs(nested_refbook, tmp_path, json_output=False, compress_html=True)
+    assert (tmp_path / "index.html").read_text() == generate_html(
+        nested_refbook, compress=True,
+    )
+
+
+def test_viewer_html_loads_at_runtime() -> None:
+    html = generate_viewer_html()
+    assert '<script type="application/json" id="refbook-data" data-src="refbook.json"></script>' in html
+    assert 'id="open-refbook"' in html
+    assert "indexedDB.open" in html
+    assert "crypto.subtle.digest" in html
+    assert html == generate_viewer_html()
@@ -2,7 +2,11 @@ from __future__ import annotations
 
 import json
 
+import pytest
+
 from sv_ref.core.models import (
+    SCHEMA_SHARED_TYPES,
+    AmbiguousTypeError,
     EnumMember,
     FieldType,
     Refbook,
@@ -214,3 +218,133 @@ def test_refbook_json_round_trip():
     restored = Refbook.model_validate_json(json_str)
     assert restored == refbook
     assert restored.types[0].fields[1].enum_members[0].name == "IDLE"
+
+
+def _nested_refbook() -> Refbook:
+    inner = [
+        StructField(name="a", width=8, offset=8,
+                    field_type=FieldType(name="logic[7:0]")),
+        StructField(name="b", width=8, offset=0,
+                    field_type=FieldType(name="logic[7:0]")),
+    ]
+    return Refbook(
+        meta=RefbookMeta(
+            version="0.1.0",
+            generated_at="2026-02-07T12:00:00Z",
+            source_files=["nested.sv"],
+        ),
+        types=[
+            SVType(name="inner_t", kind=TypeKind.STRUCT, total_width=16,
+                   package="pkg_a", fields=inner),
+            SVType(
+                name="outer_t", kind=TypeKind.STRUCT, total_width=32,
+                package="pkg_a",
+                fields=[
+                    StructField(
+                        name="data", width=16, offset=16,
+                        field_type=FieldType(name="inner_t",
+                                             kind=TypeKind.STRUCT),
+                        inner_fields=inner,
+                    ),
+                    StructField(name="extra", width=16, offset=0,
+                                field_type=FieldType(name="logic[15:0]")),
+                ],
+            ),
+        ],
+    )
+
+
+def test_refbook_shared_types_round_trip():
+    refbook = _nested_refbook()
+    shared = refbook.with_shared_types()
+    assert shared.meta.schema_version == SCHEMA_SHARED_TYPES
+
+    data = shared.model_dump()
+    assert data["meta"]["schema_version"] == SCHEMA_SHARED_TYPES
+    data_field = data["types"][1]["fields"][0]
+    assert data_field["type_ref"] == "pkg_a::inner_t"
+    assert data_field["inner_fields"] is None
+
+    restored = Refbook.model_validate(data).with_inlined_types()
+    assert restored == refbook
+
+
+def test_refbook_inlining_rejects_dangling_ref():
+    data = _nested_refbook().with_shared_types().model_dump()
+    del data["types"][0]
+    with pytest.raises(ValueError, match=(
+        r"pkg_a::outer_t\.data refers to unknown type 'pkg_a::inner_t'"
+    )):
+        Refbook.model_validate(data).with_inlined_types()
+
+
+def test_refbook_inline_dump_has_no_schema_fields():
+    data = _nested_refbook().model_dump()
+    assert "schema_version" not in data["meta"]
+    assert "type_ref" not in data["types"][1]["fields"][0]
+
+
+def test_refbook_shared_types_keeps_mismatched_definition_inline():
+    refbook = _nested_refbook()
+    refbook.types[0] = SVType(
+        name="inner_t", kind=TypeKind.STRUCT, total_width=16,
+        package="pkg_b",
+        fields=[StructField(name="z", width=16, offset=0,
+                            field_type=FieldType(name="logic[15:0]"))],
+    )
+
+    data_field = refbook.with_shared_types().types[1].fields[0]
+    assert data_field.type_ref is None
+    assert [f.name for f in data_field.inner_fields] == ["a", "b"]
+
+
+def _enum(name: str, package: str | None) -> SVType:
+    return SVType(
+        name=name, kind=TypeKind.ENUM, total_width=1, package=package,
+        members=[EnumMember(name="A", value=0)],
+    )
+
+
+def test_refbook_find_type():
+    rb = Refbook(
+        meta=RefbookMeta(version="0.1.0", generated_at="", source_files=[]),
+        types=[
+            _enum("a_e", "p_pkg"),
+            _enum("dup_e", "p_pkg"),
+            _enum("dup_e", "q_pkg"),
+            _enum("top_e", None),
+        ],
+    )
+    assert rb.find_type("a_e") is rb.types[0]
+    assert rb.find_type("q_pkg::dup_e") is rb.types[2]
+    assert rb.find_type("top_e") is rb.types[3]
+    assert rb.find_type("p_pkg::top_e") is None
+    assert rb.find_type("missing_e") is None
+
+    with pytest.raises(AmbiguousTypeError) as exc:
+        rb.find_type("dup_e")
+    assert exc.value.candidates == ["p_pkg::dup_e", "q_pkg::dup_e"]
+
+
+def test_refbook_find_type_after_copy_and_mutation():
+    rb = Refbook(
+        meta=RefbookMeta(version="0.1.0", generated_at="", source_files=[]),
+        types=[_enum("a_e", "p_pkg"), _enum("b_e", "p_pkg")],
+    )
+    assert rb.find_type("b_e") is rb.types[1]
+
+    copied = rb.model_copy(update={"types": rb.types[:1]})
+    assert copied.find_type("b_e") is None
+    assert copied.find_type("a_e") is rb.types[0]
+    assert copied == Refbook(meta=rb.meta, types=rb.types[:1])
+
+    rb.types.append(_enum("c_e", None))
+    assert rb.find_type("c_e") is rb.types[2]
+    rb.types = rb.types[1:]
+    assert rb.find_type("a_e") is None
+
+    rb.types[0] = _enum("d_e", "p_pkg")
+    assert rb.find_type("b_e") is None
+    assert rb.find_type("d_e") is rb.types[0]
+    assert rb == Refbook(meta=rb.meta, types=list(rb.types))
+    assert rb.model_copy(deep=True).find_type("d_e") == rb.types[0]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from sv_ref.core.models import AmbiguousTypeError, Refbook
+from sv_ref.core.refindex import (
+    RefbookIndex,
+    dump_refbook,
+    index_path,
+    iter_refbook,
+)
+from sv_ref.decoder import decode_hex, load_type
+from sv_ref.generator.writer import write_outputs
+
+
+def test_dump_refbook_matches_json_dumps(nested_refbook: Refbook):
+    data = nested_refbook.with_shared_types().model_dump()
+    text, index = dump_refbook(data)
+    assert text == json.dumps(data, indent=2) + "\n"
+    assert index["size"] == len(text)
+
+    for name, (offset, length) in index["types"].items():
+        record = json.loads(text[offset:offset + length])
+        assert f"{record['package']}::{record['name']}" == name
+
+
+def test_dump_refbook_empty(basic_types_refbook: Refbook):
+    data = basic_types_refbook.model_copy(update={"types": []}).model_dump()
+    text, index = dump_refbook(data)
+    assert text == json.dumps(data, indent=2) + "\n"
+    assert index["types"] == {}
+
+
+def test_iter_refbook_streams_dump_refbook(nested_refbook: Refbook):
+    data = nested_refbook.with_shared_types().model_dump()
+    index: dict = {}
+    chunks = list(iter_refbook(data["meta"], iter(data["types"]), index))
+    assert len(chunks) == len(data["types"]) + 2
+    assert ("".join(chunks), index) == dump_refbook(data)
+
+
+def test_load_type_from_index(nested_refbook: Refbook, tmp_path: Path):
+    write_outputs(nested_refbook, tmp_path, html_output=False)
+    path = tmp_path / "refbook.json"
+    assert index_path(path).exists()
+
+    index = RefbookIndex.load(path)
+    assert index is not None
+    outer = index.load_type("outer_t")
+    # The shared inner_t definition is read from its own record.
+    assert outer.fields[0].inner_fields is not None
+    assert [r["decoded"] for r in decode_hex(outer, "12345678")] == [
+        "4660", "18", "52", "22136",
+    ]
+    assert load_type(path, "outer_t") == outer
+    assert load_type(path, "missing_t") is None
+
+
+def test_load_type_ignores_stale_index(
+    basic_types_refbook: Refbook, tmp_path: Path,
+):
+    write_outputs(basic_types_refbook, tmp_path, html_output=False)
+    path = tmp_path / "refbook.json"
+    path.write_text(path.read_text() + "\n")
+
+    assert RefbookIndex.load(path) is None
+    assert load_type(path, "packet_t").total_width == 16
+
+
+def test_load_type_ignores_wrong_offsets(
+    basic_types_refbook: Refbook, tmp_path: Path,
+):
+    write_outputs(basic_types_refbook, tmp_path, html_output=False)
+    path = tmp_path / "refbook.json"
+    idx = index_path(path)
+    data = json.loads(idx.read_text())
+    data["types"]["test_pkg::packet_t"] = data["types"]["test_pkg::state_e"]
+    idx.write_text(json.dumps(data))
+
+    with pytest.raises(ValueError, match="does not match"):
+        RefbookIndex.load(path).load_type("packet_t")
+    assert load_type(path, "packet_t").name == "packet_t"
+
+
+def test_load_type_ambiguous_from_index(
+    basic_types_refbook: Refbook, tmp_path: Path,
+):
+    dup = basic_types_refbook.types[0].model_copy(update={"package": "b_pkg"})
+    refbook = basic_types_refbook.model_copy(
+        update={"types": [*basic_types_refbook.types, dup]},
+    )
+    write_outputs(refbook, tmp_path, html_output=False)
+
+    with pytest.raises(AmbiguousTypeError):
+        load_type(tmp_path / "refbook.json", dup.name)
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from sv_ref.core.models import Refbook
+from sv_ref.generator.writer import write_outputs
+from sv_ref.main import app
+from sv_ref.server import (
+    DecodeService,
+    is_loopback,
+    remove_stale_socket,
+    start_server,
+    watch_refbook,
+)
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def service(basic_types_refbook: Refbook, tmp_path: Path) -> DecodeService:
+    write_outputs(basic_types_refbook, tmp_path, html_output=False)
+    return DecodeService(tmp_path / "refbook.json")
+
+
+def test_handle_single_value(service: DecodeService):
+    assert service.handle({"id": 7, "type": "packet_t", "value": "AB8D"}) == {
+        "id": 7,
+        "value": "AB8D",
+        "fields": {"header": "171", "status": "ERR", "payload": "13"},
+    }
+
+
+def test_handle_batch(service: DecodeService):
+    response = service.handle(
+        {"type": "test_pkg::packet_t", "values": ["0x0040", 0xAB8D, "XYZ"]},
+    )
+    assert [r.get("fields", {}).get("status") for r in response["results"]] == [
+        "BUSY", "ERR", None,
+    ]
+    assert response["results"][2]["error"] == "invalid value: 'XYZ'"
+
+
+def test_handle_errors(service: DecodeService):
+    assert service.handle_json(b"{") == {"error": "invalid JSON"}
+    assert service.handle([1]) == {"error": "request must be a JSON object"}
+    assert service.handle({"value": "0"}) == {"error": "missing 'type'"}
+    assert service.handle({"type": "nope_t", "value": "0"}) == {
+        "error": "type 'nope_t' not found",
+    }
+    assert "error" in service.handle({"type": "packet_t"})
+
+
+def test_plan_lru_is_reused(service: DecodeService):
+    assert service.plan("packet_t") is service.plan("packet_t")
+
+
+def test_unix_socket_and_reload(
+    service: DecodeService, basic_types_refbook: Refbook, tmp_path: Path,
+):
+    socket_path = tmp_path / "sv-ref.sock"
+
+    async def request(line: dict) -> dict:
+        reader, writer = await asyncio.open_unix_connection(str(socket_path))
+        writer.write(json.dumps(line).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        writer.close()
+        return response
+
+    async def scenario() -> tuple[dict, dict]:
+        server = await start_server(service, socket_path)
+        reloader = asyncio.create_task(watch_refbook(service, 0.01))
+        async with server:
+            before = await request({"type": "packet_t", "value": "AB8D"})
+
+            renamed = basic_types_refbook.model_copy(deep=True)
+            renamed.types[1].fields[0].name = "hdr"
+            write_outputs(renamed, tmp_path, html_output=False)
+            st = os.stat(service.refbook_path)
+            os.utime(service.refbook_path, ns=(st.st_atime_ns,
+                                               st.st_mtime_ns + 10**9))
+            for _ in range(200):
+                await asyncio.sleep(0.01)
+                if not service.changed_on_disk():
+                    break
+            after = await request({"type": "packet_t", "value": "AB8D"})
+        reloader.cancel()
+        return before, after
+
+    before, after = asyncio.run(scenario())
+    assert before["fields"]["header"] == "171"
+    assert after["fields"]["hdr"] == "171"
+
+
+def test_http_post(service: DecodeService):
+    async def scenario() -> list[bytes]:
+        server = await start_server(service, host="127.0.0.1", port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            body = json.dumps({"type": "packet_t", "value": "0040"}).encode()
+            for _ in range(2):
+                writer.write(
+                    b"POST / HTTP/1.1\r\nHost: x\r\n"
+                    b"Content-Length: " + str(len(body)).encode()
+                    + b"\r\n\r\n" + body
+                )
+            await writer.drain()
+            responses = []
+            for _ in range(2):
+                status = await reader.readline()
+                headers = {}
+                while (line := await reader.readline()) != b"\r\n":
+                    name, _, value = line.decode().partition(":")
+                    headers[name.lower()] = value.strip()
+                payload = await reader.readexactly(
+                    int(headers["content-length"]),
+                )
+                responses.append(status + payload)
+            writer.close()
+        return responses
+
+    for response in asyncio.run(scenario()):
+        status, payload = response.split(b"\r\n", 1)
+        assert status == b"HTTP/1.1 200 OK"
+        assert json.loads(payload)["fields"]["status"] == "BUSY"
+
+
+def test_is_loopback():
+    assert is_loopback("127.0.0.1")
+    assert is_loopback("::1")
+    assert is_loopback("localhost")
+    assert not is_loopback("0.0.0.0")
+    assert not is_loopback("example.com")
+
+
+def test_remove_stale_socket(tmp_path: Path):
+    path = tmp_path / "sv-ref.sock"
+    remove_stale_socket(path)
+
+    path.write_text("not a socket")
+    with pytest.raises(FileExistsError, match="not a socket"):
+        remove_stale_socket(path)
+    path.unlink()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as live:
+        live.bind(str(path))
+        live.listen()
+        with pytest.raises(FileExistsError, match="in use"):
+            remove_stale_socket(path)
+    # Closed without unlinking, as after a crash.
+    assert path.is_socket()
+    remove_stale_socket(path)
+    assert not path.exists()
+
+
+def test_serve_rejects_remote_host(service: DecodeService):
+    result = runner.invoke(
+        app, ["serve", str(service.refbook_path), "--host", "0.0.0.0"],
+    )
+    assert result.exit_code == 1
+    assert "--allow-remote" in result.output
+
+
+def test_serve_removes_socket_on_sigterm(service: DecodeService, tmp_path: Path):
+    socket_path = tmp_path / "sv-ref.sock"
+    proc = subprocess.Popen(
+        [sys.executable, "-c", "from sv_ref.main import app; app()",
+         "serve", str(service.refbook_path), "--socket", str(socket_path)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        assert proc.stdout.readline().startswith("Serving ")
+        assert socket_path.is_socket()
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=10) == 0
+    finally:
+        proc.kill()
+        proc.stdout.close()
+    assert not socket_path.exists()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from sv_ref.core.models import Refbook
+from sv_ref.generator.writer import write_outputs
+
+HEAVY_MODULES = ("pyslang", "jinja2")
+
+_SCRIPT = """\
+import json
+import sys
+from sv_ref.main import main
+sys.argv = ["sv-ref", *sys.argv[1:]]
+try:
+    main()
+except SystemExit:
+    pass
+print(json.dumps([m for m in {modules!r} if m in sys.modules]))
+"""
+
+
+def _loaded_heavy_modules(*args: str) -> tuple[str, list[str]]:
+    result = subprocess.run(
+        [sys.executable, "-c", _SCRIPT.format(modules=HEAVY_MODULES), *args],
+        capture_output=True, text=True, check=True,
+    )
+    *output, loaded = result.stdout.splitlines()
+    return "\n".join(output), json.loads(loaded)
+
+
+def test_version_skips_heavy_imports():
+    output, loaded = _loaded_heavy_modules("--version")
+    assert output.startswith("sv-ref ")
+    assert loaded == []
+
+
+@pytest.mark.parametrize("command", ["decode", "decode-batch"])
+def test_decode_skips_heavy_imports(
+    command: str, basic_types_refbook: Refbook, tmp_path: Path,
+):
+    write_outputs(basic_types_refbook, tmp_path, html_output=False)
+    args = [command, str(tmp_path / "refbook.json"), "packet_t"]
+    if command == "decode":
+        args.append("AB8D")
+    else:
+        values = tmp_path / "values.txt"
+        values.write_text("AB8D\n")
+        args += ["-i", str(values)]
+
+    output, loaded = _loaded_heavy_modules(*args)
+    assert "ERR" in output
+    assert loaded == []
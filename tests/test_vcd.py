@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from sv_ref.core.models import Refbook
+from sv_ref.decoder import compile_decoder, find_type
+from sv_ref.main import app
+from sv_ref.vcd import decode_changes, map_signals, read_header, write_annotated
+
+runner = CliRunner()
+
+VCD = """\
+$timescale 1ns $end
+$scope module top $end
+$var wire 16 ! pkt [15:0] $end
+$var wire 1 " clk $end
+$upscope $end
+$enddefinitions $end
+#0
+$dumpvars
+b0 !
+0"
+$end
+#10
+1"
+b1010101110001101 !
+#20
+0" b1010101100000100 !
+$comment b1 ! $end
+#30
+bz0000000 !
+"""
+
+
+def _signals(refbook: Refbook, lines, path="top.pkt", name="packet_t"):
+    header = read_header(lines)
+    return header, map_signals(header, {path: find_type(refbook, name)})
+
+
+def test_read_header_paths():
+    header = read_header(iter(VCD.splitlines(keepends=True)))
+    assert [(v.path, v.code, v.width) for v in header.vars] == [
+        ("top.pkt", "!", 16),
+        ("top.clk", '"', 1),
+    ]
+
+
+def test_decode_changes(basic_types_refbook: Refbook):
+    lines = iter(VCD.splitlines(keepends=True))
+    _, signals = _signals(basic_types_refbook, lines)
+
+    changes = list(decode_changes(lines, signals))
+    assert [(c["time"], c["value"]) for c in changes] == [
+        (0, "0000"), (10, "AB8D"), (20, "AB04"), (30, "ZZZ0"),
+    ]
+    assert changes[1]["fields"] == {
+        "header": "171", "status": "ERR", "payload": "13",
+    }
+    assert changes[3]["fields"] == {
+        "header": "z", "status": "z", "payload": "0",
+    }
+
+
+def test_map_signals_errors(basic_types_refbook: Refbook):
+    with pytest.raises(ValueError, match="not found"):
+        _signals(basic_types_refbook, iter(VCD.splitlines()), path="top.x")
+    with pytest.raises(ValueError, match="is 1 bits"):
+        _signals(basic_types_refbook, iter(VCD.splitlines()), path="top.clk")
+
+
+def test_decode_bits_unknown(basic_types_refbook: Refbook):
+    plan = compile_decoder(find_type(basic_types_refbook, "packet_t"))
+    assert plan.decode_bits("1010101110001101") == ["171", "ERR", "13"]
+    assert plan.decode_bits("x0101011zz001101") == ["x", "z", "13"]
+
+
+def test_write_annotated(basic_types_refbook: Refbook):
+    lines = iter(VCD.splitlines(keepends=True))
+    header, signals = _signals(basic_types_refbook, lines)
+    out = io.StringIO()
+    write_annotated(header, lines, signals, out)
+
+    text = out.getvalue()
+    assert (
+        "$var wire 16 ! pkt [15:0] $end\n"
+        "$scope module pkt $end\n"
+        "$var wire 8 # header [7:0] $end\n"
+        "$var wire 2 $ status [1:0] $end\n"
+        "$var wire 6 % payload [5:0] $end\n"
+        "$upscope $end\n"
+    ) in text
+    # header keeps its value at #20, so only status and payload change.
+    body = text.split("$enddefinitions $end\n")[1]
+    assert body.split("#20\n")[1] == (
+        '0" b1010101100000100 !\n'
+        "b00 $\n"
+        "b000100 %\n"
+        "$comment b1 ! $end\n"
+        "#30\n"
+        "bz0000000 !\n"
+        "bzzzzzzzz #\n"
+        "bz0 $\n"
+        "b000000 %\n"
+    )
+
+
+def test_vcd_cli_jsonl(basic_refbook_path: Path, tmp_path: Path):
+    vcd_path = tmp_path / "dump.vcd"
+    vcd_path.write_text(VCD)
+    result = runner.invoke(app, [
+        "vcd", str(basic_refbook_path), str(vcd_path),
+        "--map", "top.pkt=packet_t",
+    ])
+    assert result.exit_code == 0
+    first = json.loads(result.output.splitlines()[1])
+    assert first == {
+        "time": 10, "signal": "top.pkt", "value": "AB8D",
+        "fields": {"header": "171", "status": "ERR", "payload": "13"},
+    }
+
+
+def test_vcd_cli_writes_vcd(basic_refbook_path: Path, tmp_path: Path):
+    vcd_path = tmp_path / "dump.vcd"
+    vcd_path.write_text(VCD)
+    out_path = tmp_path / "decoded.vcd"
+    result = runner.invoke(app, [
+        "vcd", str(basic_refbook_path), str(vcd_path),
+        "-m", "top.pkt=packet_t", "--format", "vcd", "-o", str(out_path),
+    ])
+    assert result.exit_code == 0
+    assert "$scope module pkt $end" in out_path.read_text()
+
+
+def test_vcd_cli_bad_map(basic_refbook_path: Path, tmp_path: Path):
+    vcd_path = tmp_path / "dump.vcd"
+    vcd_path.write_text(VCD)
+    result = runner.invoke(app, [
+        "vcd", str(basic_refbook_path), str(vcd_path), "-m", "top.pkt",
+    ])
+    assert result.exit_code != 0
+    assert "expected signal=type" in result.output
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from sv_ref.core.analyzer import IncrementalAnalyzer
+from sv_ref.watch import rebuild, watch
+
+
+def _touch(path: Path, text: str) -> None:
+    old = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(text)
+    # Coarse filesystem timestamps could otherwise hide the change.
+    os.utime(path, ns=(old + 10**9, old + 10**9))
+
+
+def _write_design(tmp_path: Path) -> tuple[Path, Path, Path]:
+    inc = tmp_path / "inc"
+    inc.mkdir()
+    _touch(inc / "defs.svh", "typedef enum logic [1:0] { A, B } ab_e;\n")
+    a = tmp_path / "a.sv"
+    _touch(
+        a,
+        '`include "defs.svh"\n'
+        "package a_pkg;\n"
+        "    typedef struct packed { ab_e sel; logic [5:0] d; } a_t;\n"
+        "endpackage\n",
+    )
+    b = tmp_path / "b.sv"
+    _touch(
+        b,
+        "package b_pkg;\n"
+        "    typedef struct packed { logic [3:0] x; } b_t;\n"
+        "endpackage\n",
+    )
+    return a, b, inc
+
+
+def test_incremental_reparses_only_changed_file(tmp_path: Path):
+    a, b, inc = _write_design(tmp_path)
+    analyzer = IncrementalAnalyzer([a, b], [inc])
+
+    refbook, changed = analyzer.update()
+    assert changed == [a, b]
+    assert {t.name for t in refbook.types} == {"a_t", "b_t"}
+    assert analyzer.stale_files() == []
+
+    _touch(
+        b,
+        "package b_pkg;\n"
+        "    typedef struct packed { logic [3:0] x; } b_t;\n"
+        "    typedef enum logic { OFF, ON } onoff_e;\n"
+        "endpackage\n",
+    )
+    refbook, changed = analyzer.update()
+    assert changed == [b]
+    assert {t.name for t in refbook.types} == {"a_t", "b_t", "onoff_e"}
+
+
+def test_incremental_include_change(tmp_path: Path):
+    a, b, inc = _write_design(tmp_path)
+    analyzer = IncrementalAnalyzer([a, b], [inc])
+    analyzer.update()
+
+    _touch(inc / "defs.svh", "typedef enum logic [1:0] { A, B, C } ab_e;\n")
+    assert analyzer.stale_files() == [a, b]
+
+    refbook, changed = analyzer.update()
+    assert changed == [a, b]
+    a_t = next(t for t in refbook.types if t.name == "a_t")
+    assert [m.name for m in a_t.fields[0].enum_members] == ["A", "B", "C"]
+
+
+def test_rebuild_skips_unchanged_outputs(tmp_path: Path):
+    a, b, inc = _write_design(tmp_path)
+    out = tmp_path / "out"
+    analyzer = IncrementalAnalyzer([a, b], [inc])
+
+    refbook, report = rebuild(analyzer, out, html_output=False)
+    assert report.outputs == [out / "refbook.json"]
+    assert report.type_count == 2
+
+    _touch(b, b.read_text() + "// comment only\n")
+    _, report = rebuild(analyzer, out, html_output=False, previous=refbook)
+    assert report.changed == [b]
+    assert report.outputs == []
+    assert sorted(p.name for p in out.iterdir()) == [
+        "refbook.index.json", "refbook.json",
+    ]
+
+
+def test_watch_rebuilds_on_change(tmp_path: Path):
+    a, b, inc = _write_design(tmp_path)
+    out = tmp_path / "out"
+    analyzer = IncrementalAnalyzer([a, b], [inc])
+    reports = []
+
+    def on_rebuild(report):
+        reports.append(report)
+        if len(reports) == 1:
+            _touch(b, b.read_text().replace("[3:0]", "[7:0]"))
+
+    watch(
+        analyzer, out, on_rebuild, html_output=False,
+        poll_interval=0.01, debounce=0.01,
+        should_stop=lambda: len(reports) >= 2,
+    )
+
+    assert reports[1].changed == [b]
+    data = json.loads((out / "refbook.json").read_text())
+    b_t = next(t for t in data["types"] if t["name"] == "b_t")
+    assert b_t["total_width"] == 8
+
+
+def test_watch_survives_deleted_file(tmp_path: Path):
+    a, b, inc = _write_design(tmp_path)
+    out = tmp_path / "out"
+    analyzer = IncrementalAnalyzer([a, b], [inc])
+    b_text = b.read_text()
+    reports = []
+
+    def on_rebuild(report):
+        reports.append(report)
+        if len(reports) == 1:
+            b.unlink()
+        elif len(reports) == 2:
+            _touch(b, b_text.replace("[3:0]", "[7:0]") + "// restored\n")
+
+    watch(
+        analyzer, out, on_rebuild, html_output=False,
+        poll_interval=0.01, debounce=0.01,
+        should_stop=lambda: len(reports) >= 3,
+    )
+
+    assert "b.sv" in reports[1].error
+    assert reports[1].outputs == []
+    assert reports[2].error is None
+    assert reports[2].changed == [b]
+    data = json.loads((out / "refbook.json").read_text())
+    b_t = next(t for t in data["types"] if t["name"] == "b_t")
+    assert b_t["total_width"] == 8